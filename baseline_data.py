@@ -0,0 +1,156 @@
+import gzip
+import json
+import os
+import sys
+import threading
+'''
+THE HARDCODED BASELINE DATASET, USED TO LIVE IN hard_json.py AS ONE BIG PYTHON LITERAL THAT GOT COMPILED ON EVERY START
+
+Now it is a gzipped columnar json file that is only read the first time something asks for it:
+    baseline_data.data_json_hardcoded   list of record dicts (same as hard_json.data_json_hardcoded)
+    baseline_data.all_addresses         frozenset of address1 values, built without building the records
+
+Regenerate the file after editing the dataset:
+    python baseline_data.py build        (needs hard_json.py importable)
+The PyInstaller specs call ensure_built() so a freeze never goes out without the file.
+    python baseline_data.py measure      (startup time / memory, hard_json vs this file)
+'''
+def _base_dir():
+    # PyInstaller unpacks datas into sys._MEIPASS for the frozen builds
+    return getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
+
+BASELINE_PATH = os.path.join(_base_dir(), 'data', 'baseline.json.gz')
+
+_lock = threading.Lock()
+_cache = {}
+
+def _read_file(path=BASELINE_PATH):
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return json.load(f)
+
+def _columns():
+    if "columns" not in _cache:
+        if os.path.exists(BASELINE_PATH):
+            _cache["columns"] = _read_file()
+        else:
+            _cache["columns"] = None
+    return _cache["columns"]
+
+def _legacy_module():
+    # Trees that still have hard_json.py and no built file keep working, just without the speedup
+    try:
+        import hard_json
+        return hard_json
+    except ImportError:
+        print(f"Warning: {BASELINE_PATH} not found and no hard_json module, baseline dataset is empty.")
+        return None
+
+def get_records():
+    with _lock:
+        if "records" not in _cache:
+            table = _columns()
+            if table is None:
+                legacy = _legacy_module()
+                _cache["records"] = list(legacy.data_json_hardcoded) if legacy else []
+            else:
+                names = table["fields"]
+                columns = [table["columns"][name] for name in names]
+                records = []
+                for row in zip(*columns):
+                    # Fields a record never had are stored as a missing marker, not as None
+                    records.append({name: value for name, value in zip(names, row) if value != table["missing"]})
+                _cache["records"] = records
+        return _cache["records"]
+
+def get_all_addresses():
+    with _lock:
+        if "addresses" not in _cache:
+            table = _columns()
+            if table is None:
+                legacy = _legacy_module()
+                _cache["addresses"] = frozenset(legacy.all_addresses) if legacy else frozenset()
+            else:
+                _cache["addresses"] = frozenset(table["all_addresses"])
+        return _cache["addresses"]
+
+def __getattr__(name):
+    # Lets callers keep writing baseline_data.data_json_hardcoded / baseline_data.all_addresses
+    if name == "data_json_hardcoded":
+        return get_records()
+    if name == "all_addresses":
+        return get_all_addresses()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def build(path=BASELINE_PATH):
+    import hard_json
+    records = hard_json.data_json_hardcoded
+    missing = "\u0000missing"
+    fields = []
+    for record in records:
+        for key in record:
+            if key not in fields:
+                fields.append(key)
+
+    table = {
+        "version": 1,
+        "missing": missing,
+        "fields": fields,
+        "columns": {name: [record.get(name, missing) for record in records] for name in fields},
+        # Kept as they are in hard_json, the dedupe compares address1 against these exact values.
+        # Sorted by type then text only so rebuilds of the same data give the same file
+        "all_addresses": sorted(set(hard_json.all_addresses), key=lambda address: (type(address).__name__, str(address))),
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with gzip.open(path, 'wt', encoding='utf-8', compresslevel=9) as f:
+        json.dump(table, f, separators=(',', ':'))
+    print(f"Wrote {len(records)} records, {len(table['all_addresses'])} addresses to {path} ({os.path.getsize(path)} bytes)")
+
+def ensure_built(path=BASELINE_PATH):
+    """
+    For the PyInstaller specs. Builds the file when hard_json.py is around and newer than it, and stops the
+    freeze with a clear error when there is neither, a frozen app without it silently loses the address dedupe.
+    """
+    hard_json_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hard_json.py')
+    if os.path.exists(hard_json_path):
+        if not os.path.exists(path) or os.path.getmtime(hard_json_path) > os.path.getmtime(path):
+            build(path)
+    if not os.path.exists(path):
+        raise SystemExit(f"{path} is missing and there is no hard_json.py to build it from. "
+                         "Copy in the built file or hard_json.py, then freeze again.")
+    return path
+
+def measure():
+    import subprocess
+
+    def run(code):
+        # Fresh interpreter each time so nothing is already imported or cached
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=_base_dir())
+        return out.stdout.strip() or out.stderr.strip()
+
+    template = (
+        "import time, tracemalloc\n"
+        "tracemalloc.start(); start = time.perf_counter()\n"
+        "{body}\n"
+        "elapsed = time.perf_counter() - start\n"
+        "current, peak = tracemalloc.get_traced_memory()\n"
+        "print(f'{{elapsed * 1000:.1f}} ms, {{current / 1e6:.1f}} MB resident, {{peak / 1e6:.1f}} MB peak')"
+    )
+    if not os.path.exists(os.path.join(_base_dir(), 'hard_json.py')):
+        # Nothing real to compare against, numbers for the real dataset need the real hard_json.py
+        print("hard_json.py is not here, only timing the built file")
+        print("baseline_data all_addresses only:      ", run(template.format(body="import baseline_data; baseline_data.all_addresses")))
+        print("baseline_data records:                 ", run(template.format(body="import baseline_data; baseline_data.data_json_hardcoded")))
+        return
+    print("hard_json import + all_addresses:     ", run(template.format(body="import hard_json; hard_json.all_addresses")))
+    print("baseline_data all_addresses only:      ", run(template.format(body="import baseline_data; baseline_data.all_addresses")))
+    print("hard_json import + records:           ", run(template.format(body="import hard_json; hard_json.data_json_hardcoded")))
+    print("baseline_data records:                 ", run(template.format(body="import baseline_data; baseline_data.data_json_hardcoded")))
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "build"
+    if command == "build":
+        build()
+    elif command == "measure":
+        measure()
+    else:
+        print("usage: python baseline_data.py [build|measure]")
@@ -0,0 +1,253 @@
+import argparse
+import json
+import os
+import platform
+import re
+import shutil
+import sys
+import tempfile
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from bs4 import BeautifulSoup
+import csv_converter
+import first_site
+import second_site
+import store
+import bench_parsers
+'''
+OFFLINE THROUGHPUT BENCHMARKS FOR BOTH CRAWLERS, NO BROWSER AND NO NETWORK, EVERYTHING RUNS OFF THE SAVED PAGES IN bench/fixtures
+
+    python bench/bench_crawlers.py                                  # 1k/10k/100k, report in bench/results/latest.json
+    python bench/bench_crawlers.py --scales 1000,10000              # quicker
+    python bench/bench_crawlers.py --save-baseline                  # make this run the baseline
+    python bench/bench_crawlers.py --baseline bench/baseline.json   # exit 1 if anything got slower than --threshold
+
+Results are records/second (best of up to REPEATS runs after a warmup), a record being one license entry. The
+regression gate divides out a reference loop timed next to each run, see REFERENCE_LOOPS. Listing pages are built 100 entries
+to a page out of the stripe0/stripe1 entries in or_results_page.html so the parse cost per record is realistic.
+The bs4 and lxml backends have to agree on that page first (bench_parsers.check_parity), else it exits 1 untimed.
+
+bench/baseline.json is committed, recorded on the machine named in it. Numbers from another machine or python
+are not comparable, a warning says so, re-run with --save-baseline there to get a local one.
+'''
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURE_DIR = os.path.join(BENCH_DIR, 'fixtures')
+DEFAULT_REPORT = os.path.join(BENCH_DIR, 'results', 'latest.json')
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+ENTRIES_PER_PAGE = 100
+
+# Each measurement is the best of several runs, each on a fresh work dir. A first run shorter than WARMUP_BELOW
+# seconds is a warmup and thrown away (imports, caches, sqlite/pandas first use). After that it repeats up to
+# REPEATS times or until MEASURE_BUDGET seconds went by, so the 100k scales still run only once or twice
+REPEATS = 5
+WARMUP_BELOW = 1.0
+MEASURE_BUDGET = 10.0
+# Measurements quicker than this are reported but never gate, a few ms of scheduler noise is a big swing there
+GATE_MIN_SECONDS = 0.2
+# A fixed bit of pure python timed right after every run. Shared/virtual machines speed up and slow down by a
+# third over a minute or so, the gate compares throughput relative to this so that drift cancels out
+REFERENCE_LOOPS = 1_000_000
+
+STRIPE_DIV = re.compile(r'<div class="stripe[01][^"]*">.*?</div>', re.S)
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURE_DIR, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+def build_listing_page(fixture_html, entries=ENTRIES_PER_PAGE):
+    """A result page with entries license divs, cycling through the ones in the fixture with fresh CCB numbers."""
+    all_divs = STRIPE_DIV.findall(fixture_html)
+    # The fixture also has deliberately broken entries for the parity check, those just print errors here
+    divs = [div for div in all_divs if "business_details.aspx" in div]
+    body = []
+    for i in range(entries):
+        body.append(re.sub(r'id=(\d+)', lambda m: f"id={int(m.group(1)) + i}", divs[i % len(divs)]))
+    head, tail = fixture_html.split(all_divs[0], 1)[0], fixture_html.rsplit(all_divs[-1], 1)[1]
+    return head + "\n".join(body) + tail
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+def bench_listing_pages(page, records, parser):
+    pages = max(1, records // ENTRIES_PER_PAGE)
+    def run():
+        for _ in range(pages):
+            first_site.get_data_from_html(page, parser=parser)
+    return timed(run), pages * ENTRIES_PER_PAGE
+
+def bench_single_entry(page, records):
+    soup = BeautifulSoup(page, "html.parser")
+    divs = soup.find_all("div", class_="stripe1") + soup.find_all("div", class_="stripe0")
+    def run():
+        for i in range(records):
+            first_site.get_data_from_single_entry(divs[i % len(divs)])
+    return timed(run), records
+
+def bench_wa_detail(detail_html, records):
+    soup = BeautifulSoup(detail_html, "html.parser")
+    whole_license = soup.find(id="WholeLicense")
+    item_layout = soup.find("div", class_="itemLayout")
+    def run():
+        for _ in range(records):
+            second_site.grab_secondary_data(whole_license)
+            second_site.get_primary_data(item_layout)
+    return timed(run), records
+
+def sample_records(page, records):
+    entries = first_site.get_data_from_html(page)
+    return [entries[i % len(entries)] for i in range(records)]
+
+def bench_flatten(page, records):
+    entries = sample_records(page, records)
+    def run():
+        for entry in entries:
+            first_site.convert_big_json_to_flat_json(big_json=entry)
+    return timed(run), records
+
+def flat_records(page, records):
+    flat = [first_site.convert_big_json_to_flat_json(big_json=entry) for entry in sample_records(page, records)]
+    # Unique urls, otherwise the csv/store dedup throws most of them away
+    return [{**record, "current_url": f"http://bench.local/{i}"} for i, record in enumerate(flat)]
+
+def bench_update_csv(page, records, work_dir):
+    # One call with every record, calling it per record like the crawlers used to is quadratic and never finishes at 100k
+    rows = flat_records(page, records)
+    csv_path = os.path.join(work_dir, 'update_csv.csv')
+    return timed(lambda: csv_converter.update_csv_with_json(rows, csv_path=csv_path)), records
+
+def bench_csv_sink(page, records, work_dir):
+    rows = flat_records(page, records)
+    csv_path = os.path.join(work_dir, 'csv_sink.csv')
+    def run():
+        with csv_converter.CsvSink(csv_path) as csv_sink:
+            for start in range(0, len(rows), ENTRIES_PER_PAGE):
+                csv_sink.write(rows[start:start + ENTRIES_PER_PAGE])
+    return timed(run), records
+
+def bench_store(page, records, work_dir):
+    rows = flat_records(page, records)
+    record_store = store.RecordStore(os.path.join(work_dir, 'records.sqlite3'))
+    def run():
+        for start in range(0, len(rows), ENTRIES_PER_PAGE):
+            record_store.upsert_many("first_site", rows[start:start + ENTRIES_PER_PAGE])
+    elapsed = timed(run)
+    record_store.conn.close()
+    return elapsed, records
+
+def run_benchmarks(scales):
+    or_page = build_listing_page(read_fixture('or_results_page.html'))
+    wa_detail = read_fixture('wa_detail_page.html')
+    # Timing two parsers that disagree would just be timing a bug
+    if bench_parsers.check_parity([("built listing page", or_page)]):
+        print("PARITY FAILED, bs4 and lxml disagree on the listing page, nothing timed")
+        sys.exit(1)
+    benchmarks = {
+        "or_page_bs4": lambda n, d: bench_listing_pages(or_page, n, "bs4"),
+        "or_page_lxml": lambda n, d: bench_listing_pages(or_page, n, "lxml"),
+        "or_single_entry": lambda n, d: bench_single_entry(or_page, n),
+        "wa_detail_extract": lambda n, d: bench_wa_detail(wa_detail, n),
+        "flatten": lambda n, d: bench_flatten(or_page, n),
+        "update_csv_with_json": lambda n, d: bench_update_csv(or_page, n, d),
+        "csv_sink": lambda n, d: bench_csv_sink(or_page, n, d),
+        "store_upsert": lambda n, d: bench_store(or_page, n, d),
+    }
+    results = {}
+    for name, bench in benchmarks.items():
+        results[name] = {}
+        for scale in scales:
+            elapsed, records, runs, reference = best_of(bench, scale)
+            results[name][str(scale)] = {"seconds": round(elapsed, 4), "records": records, "runs": runs,
+                                         "records_per_s": round(records / elapsed, 1), "reference_s": round(reference, 4)}
+            print(f"{name:22} {scale:>7}  {elapsed:8.3f}s  {records / elapsed:12.1f} records/s  (best of {runs})")
+    return results
+
+def reference_seconds():
+    start = time.perf_counter()
+    total = 0
+    for i in range(REFERENCE_LOOPS):
+        total += i * i % 7
+    return time.perf_counter() - start
+
+def best_of(bench, scale):
+    times = []
+    reference_times = []
+    spent = 0.0
+    while len(times) < REPEATS and (not times or spent < MEASURE_BUDGET):
+        work_dir = tempfile.mkdtemp(prefix='bench_')
+        try:
+            elapsed, records = bench(scale, work_dir)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        spent += elapsed
+        if spent == elapsed and elapsed < WARMUP_BELOW:
+            continue  # warmup
+        times.append(elapsed)
+        reference_times.append(reference_seconds())
+    return min(times), records, len(times), min(reference_times)
+
+def find_regressions(results, baseline, threshold):
+    regressions = []
+    for name, scales in baseline.get("results", {}).items():
+        for scale, old in scales.items():
+            new = results.get(name, {}).get(scale)
+            if new is None or old["seconds"] < GATE_MIN_SECONDS:
+                continue
+            # Records per reference loop, the machine being slower right now scales both sides the same
+            old_rate = old["records_per_s"] * old.get("reference_s", 1)
+            new_rate = new["records_per_s"] * (new["reference_s"] if "reference_s" in old else 1)
+            if new_rate < old_rate * (1 - threshold):
+                regressions.append(f"{name} @ {scale}: {old['records_per_s']} -> {new['records_per_s']} records/s "
+                                   f"({(1 - new_rate / old_rate):.0%} slower after the reference loop)")
+    return regressions
+
+def write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Offline throughput benchmarks for both crawlers")
+    arg_parser.add_argument("--scales", default="1000,10000,100000", help="comma separated record counts")
+    arg_parser.add_argument("--report", default=DEFAULT_REPORT, help="where the json report goes")
+    arg_parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="report to compare against, skipped if missing")
+    # Even after the reference loop, back to back runs on a shared VM came out up to ~25% apart. 30% stays above
+    # that and still catches the 2x and worse slowdowns this is for
+    arg_parser.add_argument("--threshold", type=float, default=0.3, help="allowed throughput drop before failing (0.3 = 30%%)")
+    arg_parser.add_argument("--save-baseline", action="store_true", help="also write this run to --baseline")
+    args = arg_parser.parse_args()
+
+    scales = [int(scale) for scale in args.scales.split(",")]
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "scales": scales,
+        "results": run_benchmarks(scales),
+    }
+
+    regressions = []
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if (baseline.get("machine"), baseline.get("python")) != (report["machine"], report["python"]):
+            print(f"Warning: baseline is from {baseline.get('machine')} / python {baseline.get('python')}, "
+                  f"this is {report['machine']} / python {report['python']}, the comparison is rough")
+        regressions = find_regressions(report["results"], baseline, args.threshold)
+    report["regressions"] = regressions
+    write_json(args.report, report)
+    print(f"Report written to {args.report}")
+    if args.save_baseline:
+        write_json(args.baseline, report)
+        print(f"Baseline saved to {args.baseline}")
+
+    if regressions:
+        print(f"REGRESSIONS (more than {args.threshold:.0%} slower than {args.baseline}):")
+        for regression in regressions:
+            print("  " + regression)
+        sys.exit(1)
+    print("NO REGRESSIONS" if os.path.exists(args.baseline) else "No baseline to compare against")
+
+if __name__ == "__main__":
+    main()
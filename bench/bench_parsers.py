@@ -0,0 +1,85 @@
+import argparse
+import glob
+import os
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import first_site
+'''
+CHECKS THE LXML PARSER GIVES THE SAME DICTS AS THE BS4 ONE ON SAVED RESULT PAGES, THEN TIMES BOTH
+
+    python bench/bench_parsers.py                       # the fixtures in bench/fixtures
+    python bench/bench_parsers.py saved_pages/*.html    # pages recorded with first_site.py --save-pages saved_pages
+
+Any difference between the two (an entry, a field, the entry count, the next link or the total) prints the fields that differ
+and exits 1 before anything is timed. The bundled or_results_page.html is hand built from the live markup,
+pages recorded off the live site are the real check.
+'''
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+def load_pages(paths):
+    pages = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            pages.append((path, f.read()))
+    return pages
+
+def check_parity(pages):
+    mismatches = 0
+    for path, html in pages:
+        expected = first_site.get_data_from_html(html, parser="bs4")
+        got = first_site.get_data_from_html(html, parser="lxml")
+        if expected != got:
+            mismatches += 1
+            print(f"MISMATCH in {path}")
+            for i, (a, b) in enumerate(zip(expected, got)):
+                for key in sorted(set(a) | set(b), key=str):
+                    if a.get(key, "<missing>") != b.get(key, "<missing>"):
+                        print(f"  entry {i} {key!r}:\n    bs4:  {a.get(key, '<missing>')!r}\n    lxml: {b.get(key, '<missing>')!r}")
+            if len(expected) != len(got):
+                print(f"  bs4 found {len(expected)} entries, lxml found {len(got)}")
+        # What grab_data really reads off the first page on each path, the next link and the total
+        expected_info = first_site.first_page_info(html, parser="bs4")
+        got_info = first_site.first_page_info(html, parser="lxml")
+        if expected_info != got_info:
+            mismatches += 1
+            print(f"MISMATCH in {path}: next link / total\n    bs4:  {expected_info!r}\n    lxml: {got_info!r}")
+    return mismatches
+
+def time_backend(pages, parser, repeat):
+    entries = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for _, html in pages:
+            entries += len(first_site.get_data_from_html(html, parser=parser))
+    elapsed = time.perf_counter() - start
+    return elapsed, entries
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Parity check and throughput for the first_site parsers")
+    arg_parser.add_argument("pages", nargs="*", help="saved result page html files")
+    arg_parser.add_argument("--repeat", type=int, default=50)
+    args = arg_parser.parse_args()
+
+    paths = args.pages or sorted(glob.glob(os.path.join(FIXTURE_DIR, 'or_*.html')))
+    pages = load_pages(paths)
+    print(f"{len(pages)} pages")
+
+    if not pages:
+        print("PARITY FAILED, no pages to check")
+        sys.exit(1)
+    mismatches = check_parity(pages)
+    if mismatches:
+        print(f"PARITY FAILED ({mismatches} mismatches), not timing parsers that disagree")
+        sys.exit(1)
+    print("PARITY OK")
+
+    results = {}
+    for parser in ("bs4", "lxml"):
+        elapsed, entries = time_backend(pages, parser, args.repeat)
+        results[parser] = elapsed
+        print(f"{parser:5} {elapsed:.3f}s  {len(pages) * args.repeat / elapsed:.1f} pages/s  {entries / elapsed:.1f} entries/s")
+    print(f"lxml speedup: {results['bs4'] / results['lxml']:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import json
+import os
+import threading
+import time
+'''
+REMEMBERS HOW FAR EACH CRAWLER GOT SO A CRASH DOESNT MEAN STARTING OVER
+'''
+CHECKPOINT_PATH = './logs/checkpoint.json'
+
+_lock = threading.Lock()
+
+def _read_all(path):
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return {}
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except json.JSONDecodeError:
+        print("Warning: checkpoint file is corrupt, ignoring it.")
+        return {}
+
+def save_checkpoint(site, params, offset, row=None, path=CHECKPOINT_PATH):
+    """
+    Records the last completed offset (and row inside it, for second_site) for a site.
+    Written to a temp file and swapped in with os.replace so a crash mid write keeps the old one.
+    """
+    with _lock:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        checkpoints = _read_all(path)
+        checkpoints[site] = {
+            "params": params,
+            "offset": offset,
+            "row": row,
+            "updated": time.strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(checkpoints, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+def load_checkpoint(site, params, path=CHECKPOINT_PATH):
+    """Returns the checkpoint for site if it was made with the same search params, else None."""
+    with _lock:
+        entry = _read_all(path).get(site)
+    if not entry:
+        return None
+    if entry.get("params") != params:
+        print(f"Checkpoint for {site} was for a different search, starting from the beginning.")
+        return None
+    return entry
+
+def clear_checkpoint(site, path=CHECKPOINT_PATH):
+    """Called when a crawl finishes so the next run starts fresh."""
+    with _lock:
+        checkpoints = _read_all(path)
+        if site not in checkpoints:
+            return
+        del checkpoints[site]
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(checkpoints, f, indent=2)
+        os.replace(tmp_path, path)
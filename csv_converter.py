@@ -1,5 +1,6 @@
 import pandas as pd
 import os
+import csv
 '''
 HE WANTED AS CSV SO IM JUST GUNNA CONVERT THE JSON TO CSV IN THE END
 '''
@@ -52,3 +53,116 @@ def update_csv_with_json(new_data, csv_path='./logs/data.csv'):
 
     # Write the updated DataFrame back to the CSV, overwriting existing content
     combined_df.to_csv(csv_path, index=False, mode='w')
+
+def compact_csv(csv_path='./logs/data.csv'):
+    """Dedups on current_url and sorts by expiration_date in a single pass over the file."""
+    try:
+        df = pd.read_csv(csv_path)
+    except (FileNotFoundError, pd.errors.EmptyDataError):
+        return
+
+    if df.empty:
+        return
+
+    if 'current_url' in df.columns:
+        df = df.drop_duplicates(subset='current_url', keep='first')
+
+    if 'expiration_date' not in df.columns:
+        df['expiration_date'] = pd.NA
+
+    df['expiration_date'] = pd.to_datetime(df['expiration_date'], errors='coerce')
+    df = df.sort_values(by='expiration_date', ascending=False, na_position='last')
+
+    # Write next to the original and swap so a crash never leaves a half written csv
+    tmp_path = csv_path + '.tmp'
+    df.to_csv(tmp_path, index=False, mode='w')
+    os.replace(tmp_path, csv_path)
+
+class CsvSink:
+    """
+    Keeps the csv open and appends rows in batches instead of rewriting the whole file per record.
+    Call close() when the crawl ends, that flushes and runs the one compaction pass.
+    """
+    def __init__(self, csv_path='./logs/data.csv', batch_size=100, compact_on_close=True):
+        self.csv_path = csv_path
+        self.batch_size = batch_size
+        self.compact_on_close = compact_on_close
+        self.buffer = []
+        self.rows_written = 0
+
+        os.makedirs(os.path.dirname(csv_path), exist_ok=True)
+        self.header = self._read_header()
+        self.file = open(csv_path, 'a', newline='', encoding='utf-8')
+        self.writer = csv.DictWriter(self.file, fieldnames=self.header, extrasaction='ignore')
+
+    def _read_header(self):
+        if not os.path.exists(self.csv_path) or os.path.getsize(self.csv_path) == 0:
+            return []
+        with open(self.csv_path, 'r', newline='', encoding='utf-8') as f:
+            return next(csv.reader(f), [])
+
+    def write(self, new_data):
+        # Same input shapes as update_csv_with_json, a single dict or a list of them
+        if isinstance(new_data, dict):
+            new_data = [new_data]
+
+        for row in new_data:
+            self.buffer.append({key: ("" if value is None else value) for key, value in row.items()})
+
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+
+        new_columns = []
+        for row in self.buffer:
+            for key in row:
+                if key not in self.header and key not in new_columns:
+                    new_columns.append(key)
+
+        if new_columns:
+            self._migrate_header(self.header + new_columns)
+
+        self.writer.writerows(self.buffer)
+        self.file.flush()
+        self.rows_written += len(self.buffer)
+        self.buffer = []
+
+    def _migrate_header(self, new_header):
+        """Rewrites the file once with the wider header, old rows get blanks for the new columns."""
+        self.file.close()
+
+        if self.header:
+            tmp_path = self.csv_path + '.tmp'
+            with open(self.csv_path, 'r', newline='', encoding='utf-8') as src, \
+                 open(tmp_path, 'w', newline='', encoding='utf-8') as dst:
+                reader = csv.DictReader(src)
+                writer = csv.DictWriter(dst, fieldnames=new_header, extrasaction='ignore')
+                writer.writeheader()
+                for row in reader:
+                    writer.writerow(row)
+            os.replace(tmp_path, self.csv_path)
+            self.file = open(self.csv_path, 'a', newline='', encoding='utf-8')
+        else:
+            # Nothing usable in the file yet, start it over with the header
+            self.file = open(self.csv_path, 'w', newline='', encoding='utf-8')
+            csv.writer(self.file).writerow(new_header)
+
+        self.header = new_header
+        self.writer = csv.DictWriter(self.file, fieldnames=self.header, extrasaction='ignore')
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.flush()
+        self.file.close()
+        if self.compact_on_close:
+            compact_csv(self.csv_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
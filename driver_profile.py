@@ -0,0 +1,51 @@
+import hyperSel
+import hyperSel.selenium_utilities
+'''
+LEAN BROWSER PROFILE FOR THE CRAWLERS, THEY ONLY READ THE HTML SO IMAGES, FONTS, MEDIA AND TRACKERS ARE NEVER DOWNLOADED
+The browser itself always comes from hyperSel's open_site_selenium, so it has the same user agent, flags and
+host rules as the non lean one. That opener takes no options, so the lean part is all done afterwards through
+Chrome DevTools (Network.setBlockedURLs), blocking by url. Other browsers just get the normal profile.
+Run a crawler with --no-lean to compare, the per page navigation timings land in ./logs/metrics.jsonl tagged by profile.
+'''
+# The trailing * is so query strings (font.woff2?v=3) still match. Images served without an extension still load,
+# a chrome pref could stop those but only at launch and hyperSel builds the options. Stylesheets are left alone on
+# purpose, selenium's visibility checks on itemSingleCol/nextButton go off the layout and they are cached after page 1
+BLOCKED_URL_PATTERNS = [
+    "*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.svg*", "*.ico*", "*.bmp*",
+    "*.woff*", "*.ttf*", "*.otf*", "*.eot*",
+    "*.mp4*", "*.webm*", "*.mp3*",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*facebook.net*", "*hotjar.com*",
+]
+
+# Small but wide enough that the results lists keep their desktop layout
+LEAN_VIEWPORT = (1280, 800)
+
+def block_resources(driver, patterns=BLOCKED_URL_PATTERNS):
+    """Stops the browser fetching anything matching patterns from now on. False when the driver has no CDP."""
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(patterns)})
+        return True
+    except Exception as e:
+        print(f"Resource blocking not available on this driver: {e}")
+        return False
+
+def open_driver(url, show_browser=False, lean=True):
+    """
+    open_site_selenium, plus the lean profile. hyperSel opens on about:blank so the blocking is set up before
+    url loads, even its first load skips the extras. A visible browser is still maximized, a headless one gets
+    the small fixed viewport instead, laying out a full size window nobody sees is wasted time.
+    """
+    if not lean:
+        driver = hyperSel.selenium_utilities.open_site_selenium(url, show_browser=show_browser)
+        hyperSel.selenium_utilities.maximize_the_window(driver)
+        return driver
+
+    driver = hyperSel.selenium_utilities.open_site_selenium("about:blank", show_browser=show_browser)
+    block_resources(driver)
+    if show_browser:
+        hyperSel.selenium_utilities.maximize_the_window(driver)
+    else:
+        driver.set_window_size(*LEAN_VIEWPORT)
+    hyperSel.selenium_utilities.go_to_site(driver, url)
+    return driver
@@ -2,20 +2,27 @@ import tkinter as tk
 import threading
 import queue
 import hyperSel
-import hyperSel.log_utilities
-import hyperSel.nodriver_utilities
 import re
 import hyperSel.selenium_utilities
 from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
 import time
-import random
 import hyperSel.soup_utilities
-from selenium.webdriver.common.action_chains import ActionChains
 from bs4 import BeautifulSoup
 import sys
+import os
 import json
-import pandas as pd
-import csv_converter
+import store
+import http_fetch
+import page_scheduler
+import rate_limiter
+import checkpoint
+import first_site_lxml
+import pipeline
+import metrics
+import site_urls
+import driver_profile
+import functools
+import argparse
 driver = None
 
 def extract_total(string):
@@ -132,8 +139,20 @@ def extract_ce_requirements(div):
 
     return ce_data
 
-def get_data_from_page(driver):
+def get_data_from_page(driver, parser="bs4"):
+    if parser == "lxml":
+        return first_site_lxml.get_data_from_html(driver.page_source)
     soup = hyperSel.selenium_utilities.get_driver_soup(driver)
+    return get_data_from_soup(soup)
+
+def get_data_from_html(html, parser="bs4"):
+    # Same parsing as get_data_from_page, for pages fetched without the browser
+    if parser == "lxml":
+        return first_site_lxml.get_data_from_html(html)
+    soup = BeautifulSoup(html, "html.parser")
+    return get_data_from_soup(soup)
+
+def get_data_from_soup(soup):
     entries = []
     for entry in soup.find_all("div", class_="stripe1"):
         try:
@@ -182,45 +201,143 @@ def replace_i_param(url, n):
     new_url = urlunparse(parsed_url._replace(query=new_query))
     return new_url
 
-def smooth_mouse_move(driver, duration=5):
-    start_time = time.time()
-    action = ActionChains(driver)
-    
-    while time.time() - start_time < duration:
-        x_offset = random.randint(-10, 10)
-        y_offset = random.randint(-10, 10)
-        action.move_by_offset(x_offset, y_offset).perform()
-        time.sleep(random.uniform(0.05, 0.15))
-        action = ActionChains(driver)
-
-def grab_data(driver):
-    soup = hyperSel.selenium_utilities.get_driver_soup(driver)
+def parse_page(html, parser="bs4", crawl_metrics=None):
+    # Parse stage of the pipeline, html in, flat records out
+    start = time.perf_counter()
+    if parser == "lxml":
+        # lxml builds its tree and extracts in one call, it all counts as extract
+        entries = first_site_lxml.get_data_from_html(html)
+        soup_done = start
+    else:
+        soup = BeautifulSoup(html, "html.parser")
+        soup_done = time.perf_counter()
+        entries = get_data_from_soup(soup)
+    records = [convert_big_json_to_flat_json(big_json=data) for data in entries]
+    if crawl_metrics:
+        if soup_done > start:
+            crawl_metrics.record("soup", soup_done - start)
+        crawl_metrics.record("extract", time.perf_counter() - soup_done, entries=len(records))
+    return records
+
+def write_page(record_store, record_queue, crawl_metrics, params, offset, records, checkpoint_ok=True):
+    # Writer stage, runs on the one writer thread in offset order
+    start = time.perf_counter()
+    statuses = record_store.upsert_many("first_site", records)
+    # New or changed records, ones we already had as-is dont need to go anywhere
+    written = [flat_json for flat_json, status in zip(records, statuses) if status != store.UNCHANGED]
+    crawl_metrics.record("store_write", time.perf_counter() - start, offset=offset, records=len(records))
+    crawl_metrics.count_records(len(written))
+    if record_queue is not None and written:
+        # Live feed for the gui, only what actually got saved
+        record_queue.put(written)
+    if checkpoint_ok:
+        checkpoint.save_checkpoint("first_site", params, offset)
+
+def search_params(url):
+    # The query minus the i= offset, this is what identifies "the same search" for a checkpoint
+    query_params = parse_qs(urlparse(url).query)
+    query_params.pop('i', None)
+    return {key: query_params[key] for key in sorted(query_params)}
+
+def fetch_pages_sequential(driver, session, offsets, url_for_offset):
+    # One page at a time, either through the browser or the http session. Only grabs the html,
+    # parsing happens on the pipeline so the next navigation can start straight away
+    for offset in offsets:
+        print("AM I RUNNING?")
+        page_url = url_for_offset(offset)
+        # The limiter replaces the old fixed 20s + 3-10s sleeps, it paces off how fast the site answers
+        with rate_limiter.shared_limiter.request(page_url):
+            if session:
+                html = http_fetch.fetch_html(session, page_url)
+            else:
+                hyperSel.selenium_utilities.go_to_site(driver, page_url)
+                html = driver.page_source
+        yield offset, html
+
+def save_page(directory, offset, html):
+    # Raw result pages as the site sent them, what bench/bench_parsers.py and the bench fixtures are meant to run on
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, f"or_results_{offset}.html"), 'w', encoding='utf-8') as f:
+        f.write(html)
+
+def first_page_info(html, parser="bs4"):
+    """The Next 25 href and the result total off the first results page, what grab_data starts the crawl from."""
+    if parser == "lxml":
+        # No bs4 tree on this path at all
+        return first_site_lxml.get_next_href(html), first_site_lxml.extract_total(html)
+    # The same tree hyperSel's get_driver_soup builds
+    soup = BeautifulSoup(html, features="lxml")
     tag_with_next_item = soup.find("tr", class_="light bodytext")
-    next_link = tag_with_next_item.find("a", text="Next 25")
+    next_link = tag_with_next_item.find("a", text="Next 25") if tag_with_next_item else None
+    return (next_link.get("href") if next_link else None), extract_total(str(soup))
+
+def grab_data(driver, fetch_mode="selenium", workers=1, resume=False, parser="bs4", parse_workers=2, record_queue=None, progress_queue=None, lean=True, save_pages=None):
+    next_href, total = first_page_info(driver.page_source, parser=parser)
     items_per_page = 100
-    next_url = next_link.get("href") + f'&items_per_page={items_per_page}'
-    full_url = f"https://www4.cbs.state.or.us/exs/all/mylicsearch/{next_url}"
+    next_url = next_href + f'&items_per_page={items_per_page}'
+    full_url = f"{site_urls.OR_BASE_URL}{next_url}"
     iter_ = 1
-    total = extract_total(str(soup))
+    params = search_params(full_url)
+    if resume and (saved := checkpoint.load_checkpoint("first_site", params)):
+        # Jump straight past the last page that was fully written
+        iter_ = saved["offset"] + items_per_page
+        print(f"Resuming from offset {iter_} of {total}")
+    offsets = page_scheduler.page_offsets(iter_, total, items_per_page)
+    url_for_offset = lambda offset: replace_i_param(full_url, offset)
+    record_store = store.RecordStore()
+    crawl_metrics = metrics.CrawlMetrics("first_site", tags={"profile": "lean" if lean else "full"})
+
+    # In http mode the browser is only used to get past the captcha, pages come straight from the server
+    session = None
+    if fetch_mode == "http":
+        cookies, user_agent = http_fetch.get_driver_cookies(driver)
+        session = http_fetch.build_session(cookies, user_agent)
+
+    if session and workers > 1:
+        # Every worker gets its own session off the same cookies
+        def make_fetcher():
+            worker_session = http_fetch.build_session(cookies, user_agent)
+            return lambda page_url: http_fetch.fetch_html(worker_session, page_url)
+
+        pages = page_scheduler.fetch_sharded(offsets, url_for_offset, make_fetcher, workers=workers)
+    else:
+        pages = fetch_pages_sequential(driver, session, offsets, url_for_offset)
+
+    crawl_pipeline = pipeline.CrawlPipeline(
+        parse=functools.partial(parse_page, parser=parser, crawl_metrics=crawl_metrics),
+        write=functools.partial(write_page, record_store, record_queue, crawl_metrics, params),
+        parse_workers=parse_workers,
+    )
+    finished = False
     
-    while iter_ < total:
-        print("AM I RUNNING?")
-        hyperSel.selenium_utilities.go_to_site(driver, full_url)
-        time.sleep(20)
-        loop_data = get_data_from_page(driver)
-        for data in loop_data:
-            # print("data:", data)
-            flat_json = convert_big_json_to_flat_json(big_json=data)
-            hyperSel.log_utilities.log_data(flat_json)
-            csv_converter.update_csv_with_json(flat_json)
-
-        iter_ += items_per_page
-        full_url = replace_i_param(full_url, iter_)
-        time.sleep(random.uniform(3, 10))
-
-def run(queue):
+    try:
+        fetch_start = time.perf_counter()
+        for iter_, html in pages:
+            # Time spent getting the next page in order, fetch plus limiter pacing
+            crawl_metrics.record("navigation", time.perf_counter() - fetch_start, offset=iter_)
+            if save_pages:
+                save_page(save_pages, iter_, html)
+            crawl_pipeline.submit(html, meta=iter_)
+            if progress_queue:
+                progress_queue.put(crawl_metrics.progress(min(total, iter_ + items_per_page - 1), total))
+            fetch_start = time.perf_counter()
+        finished = True
+    finally:
+        pages.close()
+        # Lets the parse/write stages finish what was already fetched before anything is closed
+        crawl_pipeline.close()
+        if crawl_pipeline.failed:
+            print("FAILED, --resume will start again before the first of these:", crawl_pipeline.failed)
+        elif finished and not crawl_pipeline.errors:
+            checkpoint.clear_checkpoint("first_site")
+        record_store.close()
+        crawl_metrics.close()
+        if session:
+            session.close()
+
+def run(queue, fetch_mode="selenium", workers=1, resume=False, parser="bs4", parse_workers=2, record_queue=None, progress_queue=None, lean=True, save_pages=None):
     global driver
-    url = "https://www4.cbs.state.or.us/exs/all/mylicsearch/index.cfm?fuseaction=search.show_search_name&group_id=30"
+    url = site_urls.OR_BASE_URL + site_urls.OR_SEARCH_PATH
     driver = hyperSel.selenium_utilities.open_site_selenium(url)
     hyperSel.selenium_utilities.maximize_the_window(driver)
 
@@ -232,9 +349,12 @@ def run(queue):
                 input_button_element_xpath = '''//*[@id="main"]/div/div/div/div/div[3]/div/form/div/div/div[6]/input[1]'''
                 element = hyperSel.selenium_utilities.select_element_by_xpath(driver, input_button_element_xpath)
                 element.click()
+                if lean:
+                    # Only after the captcha is solved, it needs its images. The window stays maximized since it is on screen
+                    driver_profile.block_resources(driver)
 
                 try:
-                    grab_data(driver)
+                    grab_data(driver, fetch_mode=fetch_mode, workers=workers, resume=resume, parser=parser, parse_workers=parse_workers, record_queue=record_queue, progress_queue=progress_queue, lean=lean, save_pages=save_pages)
                 except Exception as e:
                     print(e)
                     pass
@@ -313,13 +433,32 @@ def convert_big_json_to_flat_json(big_json, parent_key='', sep='_'):
 
         return flat_json
 
-def main():
+def main(fetch_mode="selenium", workers=1, resume=False, parser="bs4", parse_workers=2, record_queue=None, progress_queue=None, lean=True, save_pages=None):
     communication_queue = queue.Queue()
     gui_thread = threading.Thread(target=gui, args=(communication_queue,))
     gui_thread.start()
-    run(communication_queue)
+    run(communication_queue, fetch_mode=fetch_mode, workers=workers, resume=resume, parser=parser, parse_workers=parse_workers, record_queue=record_queue, progress_queue=progress_queue, lean=lean, save_pages=save_pages)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Crawl the Oregon license search")
+    parser.add_argument("--fetch-mode", choices=["selenium", "http"], default="selenium",
+                        help="how result pages are fetched after the captcha (http hands the browser cookies to a requests session)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="result pages fetched at once, only used with --fetch-mode http")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue from the last checkpointed offset of the same search")
+    parser.add_argument("--parser", choices=["bs4", "lxml"], default="bs4",
+                        help="backend for the result page parsing, lxml gives the same dicts faster")
+    parser.add_argument("--parse-workers", type=int, default=2,
+                        help="threads parsing fetched pages while the next one is being fetched")
+    parser.add_argument("--lean", action=argparse.BooleanOptionalAction, default=True,
+                        help="block images/fonts/media once past the captcha (--no-lean to compare page load times)")
+    parser.add_argument("--save-pages", metavar="DIR",
+                        help="also write every result page's html to DIR, eg to record bench fixtures")
+    return parser.parse_args()
 
 if __name__ == "__main__":
     #obj = {'owner_name': 'A ABSOLUTE COMFORT HEATING & COOLING INC', 'license_number': 'N/A', 'License Holder': 'ANDREW C HART', 'address1': '15886 PARK PLACE CT', 'city': 'OREGON CITY, OR\xa0\n\t\t\t\t\t\t97045', 'License Type': 'N/A', 'business_type': 'N/A', 'phone_number': '503-513-4795', 'original Issue Date': '03/14/2006', 'expiration_date': '07/01/2026', 'County': 'N/A', 'CCB No': '132407', 'current_url': 'http://search.ccb.state.or.us/search/business_details.aspx?id=132407', 'Signing Person Information': 'Signing Person InformationBYRON D HAYZLETT: 15580JROBERT ADAM HAUPT: 23749J', 'CE Requirements_Total CE Required': 'A ABSOLUTE COMFORT HEATING & COOLING INC', 'CE Requirements_Required Breakdown_CC': 'N/A', 'CE Requirements_Required Breakdown_ORL': 'N/A', 'CE Requirements_Required Breakdown_CC Description': 'N/A', 'CE Requirements_Current CE_CC': 'Status:Active', 'CE Requirements_Current CE_CR': 'Original Issue Date: 03/14/2006Expiration Date: 07/01/2026', 'CE Requirements_Current CE_ORL': 'CCB No:132407', 'CE Requirements_Total Held CE': 'N/A'}
     #csv_converter.update_csv_with_json(obj)
-    main()
+    args = parse_args()
+    main(fetch_mode=args.fetch_mode, workers=args.workers, resume=args.resume, parser=args.parser, parse_workers=args.parse_workers, lean=args.lean, save_pages=args.save_pages)
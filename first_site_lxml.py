@@ -0,0 +1,200 @@
+import re
+from html import unescape
+import lxml.html
+from lxml import etree
+'''
+SAME OUTPUT AS first_site.get_data_from_page BUT ON LXML WITH THE XPATHS COMPILED ONCE, PICK IT WITH --parser lxml
+'''
+STRIPE_XPATHS = [
+    # first_site reads the stripe1 entries before the stripe0 ones, keep that order
+    etree.XPath("//div[contains(concat(' ', normalize-space(@class), ' '), ' stripe1 ')]"),
+    etree.XPath("//div[contains(concat(' ', normalize-space(@class), ' '), ' stripe0 ')]"),
+]
+ROWS = etree.XPath(".//tr")
+CELLS = etree.XPath(".//td")
+BOLDS = etree.XPath(".//b")
+FIRST_CELL = etree.XPath("(.//td)[1]")
+FIRST_LINK = etree.XPath("(.//a)[1]")
+FIRST_BOLD = etree.XPath("(.//b)[1]")
+COLSPAN2_CELL = etree.XPath("(.//td[@colspan='2'])[1]")
+COLSPAN3_CELL = etree.XPath("(.//td[@colspan='3'])[1]")
+CE_TABLE = etree.XPath("(.//table[@border='0' and @cellpadding='2' and @cellspacing='0'])[1]")
+TEXT_NODES = etree.XPath(".//text()", smart_strings=False)
+
+TOTAL_PATTERN = re.compile(r'\((\d+)\s+total\)')
+# The first "Next 25" link in the first light bodytext row, like first_site's soup.find calls
+NEXT_LINK = etree.XPath("(//tr[@class='light bodytext'])[1]//a[normalize-space(.)='Next 25']/@href", smart_strings=False)
+DATE_PATTERN = re.compile(r'\d{2}/\d{2}/\d{4}')
+LABEL_PATTERNS = {}
+
+def extract_total(html):
+    # Runs on the raw page html, no need to serialise a parsed tree first. Entities are decoded first, the bs4
+    # path gets that from str(soup) and "(5&nbsp;total)" has to come out as 5 on both
+    match = TOTAL_PATTERN.search(unescape(html))
+    if match:
+        return int(match.group(1))
+    return 100  # Default to 100 if no match is found
+
+def get_next_href(html):
+    """href of the Next 25 link on the first results page, None when there is none."""
+    found = NEXT_LINK(lxml.html.fromstring(html))
+    return found[0] if found else None
+
+def first(xpath, el):
+    found = xpath(el)
+    return found[0] if found else None
+
+def get_text(el):
+    # BeautifulSoup get_text(strip=True): every text node stripped, empties dropped, glued together
+    return "".join(text.strip() for text in TEXT_NODES(el))
+
+def tag_string(el):
+    """BeautifulSoup's .string, the text of the only child (recursing down single children), else None."""
+    children = []
+    if el.text:
+        children.append(el.text)
+    for child in el:
+        children.append(child)
+        if child.tail:
+            children.append(child.tail)
+
+    if len(children) != 1:
+        return None
+    child = children[0]
+    if isinstance(child, str):
+        return child
+    if not isinstance(child.tag, str):
+        # Comments count as strings for .string
+        return child.text
+    return tag_string(child)
+
+def sibling_text(cell):
+    """get_text(strip=True) of BeautifulSoup's cell.next_sibling, or None when there is no sibling."""
+    if cell.tail:
+        # Text right after the cell is the sibling, usually just the whitespace between tags
+        return cell.tail.strip()
+    sibling = cell.getnext()
+    if sibling is None:
+        return None
+    if not isinstance(sibling.tag, str):
+        return ""
+    return get_text(sibling)
+
+def extract_text_with_label(row, label):
+    pattern = LABEL_PATTERNS.get(label)
+    if pattern is None:
+        pattern = LABEL_PATTERNS[label] = re.compile(label)
+    try:
+        for cell in CELLS(row):
+            string = tag_string(cell)
+            if string is not None and pattern.search(string):
+                text = sibling_text(cell)
+                return text if text is not None else "N/A"
+    except Exception as e:
+        print(f"Error extracting label {label}: {e}")
+    return "N/A"
+
+def extract_dates(row):
+    dates = DATE_PATTERN.findall("".join(TEXT_NODES(row)))
+    return (dates[0] if len(dates) > 0 else "N/A", dates[1] if len(dates) > 1 else "N/A")
+
+def try_extract_text(row, default="N/A"):
+    cell = first(FIRST_CELL, row)
+    return get_text(cell) if cell is not None else default
+
+def get_data_from_single_entry(div):
+    data = {}
+    try:
+        rows = ROWS(div)
+
+        try:
+            business_name = first(COLSPAN2_CELL, rows[0])
+            data['owner_name'] = get_text(business_name) if business_name is not None else "N/A"
+        except Exception as e:
+            print(f"Error extracting owner_name: {e}")
+            data['owner_name'] = "N/A"
+
+        data['license_number'] = extract_text_with_label(rows[1], 'license_number:')
+
+        holder = first(COLSPAN2_CELL, rows[1])
+        data['License Holder'] = get_text(holder) if holder is not None else "N/A"
+
+        data['address1'] = try_extract_text(rows[2])
+        data['city'] = try_extract_text(rows[3])
+        data['License Type'] = extract_text_with_label(rows[2], 'Type:')
+        data['business_type'] = extract_text_with_label(rows[3], 'Status:')
+        data['phone_number'] = try_extract_text(rows[4])
+
+        issue_date, exp_date = extract_dates(rows[4])
+        data['original Issue Date'] = issue_date
+        data['expiration_date'] = exp_date
+
+        data['County'] = extract_text_with_label(rows[5], 'County:')
+
+        ccb_tag = first(FIRST_LINK, rows[5])
+        if ccb_tag is not None and ccb_tag.get('href') is not None:
+            data['CCB No'] = get_text(ccb_tag)
+            data['current_url'] = ccb_tag.get('href')
+        else:
+            data['CCB No'], data['current_url'] = "N/A", "N/A"
+
+        signing_cell = first(COLSPAN3_CELL, rows[-1])
+        if signing_cell is not None:
+            signing_info = get_text(signing_cell)
+            data['Signing Person Information'] = [line for line in signing_info.splitlines() if line] if signing_info else []
+        else:
+            data['Signing Person Information'] = []
+
+        data['CE Requirements'] = extract_ce_requirements(div)
+
+    except Exception as e:
+        pass
+
+    return data
+
+def cell_text(row_cells, index):
+    return get_text(row_cells[index]) if len(row_cells) > index else "N/A"
+
+def extract_ce_requirements(div):
+    ce_data = {}
+    ce_table = first(CE_TABLE, div)
+    if ce_table is None:
+        return ce_data
+
+    rows = ROWS(ce_table)
+    # Every row's cells are needed at least once below, find them one time
+    row_cells = [CELLS(row) for row in rows]
+
+    total_bold = first(FIRST_BOLD, rows[0]) if rows else None
+    ce_data["Total CE Required"] = get_text(total_bold) if total_bold is not None else "N/A"
+
+    if len(rows) > 1:
+        bolds = BOLDS(rows[1])
+        ce_data["Required Breakdown"] = {
+            "CC": get_text(bolds[0]) if len(bolds) > 0 else "N/A",
+            "ORL": get_text(bolds[1]) if len(bolds) > 1 else "N/A",
+            "CC Description": cell_text(row_cells[1], 3),
+        }
+    else:
+        ce_data["Required Breakdown"] = {"CC": "N/A", "ORL": "N/A", "Description": "N/A"}
+
+    ce_data["Current CE"] = {
+        "CC": cell_text(row_cells[3], 1) if len(rows) > 3 else "N/A",
+        "CR": cell_text(row_cells[4], 1) if len(rows) > 4 else "N/A",
+        "ORL": cell_text(row_cells[5], 1) if len(rows) > 5 else "N/A",
+    }
+
+    if rows and len(row_cells[-1]) > 1:
+        ce_data["Total Held CE"] = get_text(row_cells[-1][1])
+    else:
+        ce_data["Total Held CE"] = "N/A"
+
+    return ce_data
+
+def get_data_from_html(html):
+    tree = lxml.html.fromstring(html)
+    entries = []
+    for xpath in STRIPE_XPATHS:
+        for entry in xpath(tree):
+            entries.append(get_data_from_single_entry(entry))
+    return entries
@@ -10,14 +10,21 @@ import logging
 import first_site
 import second_site  # Import the crawler module
 import os
-import hard_json
+import baseline_data
 import hyperSel
 import webbrowser  # For opening links in the default browser
-import csv_converter
+import metrics
+import store
+import search_index
+import filter_masks
+import sort_keys
+import numpy as np
 
 # Constants for pagination
-BATCH_SIZE = 20
-SCROLL_THRESHOLD = 0.8  # Load more data when scrollbar is within 20% of the bottom
+SEARCH_DEBOUNCE_MS = 250  # Search runs this long after the last keystroke
+ROW_HEIGHT = 140  # Roughly one entry card, decides how many pooled rows fit in the results area
+INGEST_POLL_MS = 50  # How often new records are picked up from the loader and the crawlers
+INGEST_BUDGET_MS = 30  # Most time one tick spends merging records, the rest is left for the UI
 
 # Set up logging configuration
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -29,51 +36,79 @@ def clean_entry(entry):
             entry[key] = value.replace("\n", "").replace("\t", "").strip()
     return entry
 
-def load_crawl_data(filepath="./logs/crawl_data.json"):
-    """Loads data from a JSON file and combines it with hardcoded data."""
-    combined_data = []
-    city_addr_pairs = []
-    dupes = 0
-    # Add hardcoded data
-    for entry in hard_json.data_json_hardcoded:
+def record_key(entry):
+    """Normalized (city, address) so casing and stray whitespace dont make two copies of one license."""
+    city = " ".join(str(entry.get('city') or "").lower().split())
+    addr = " ".join(str(entry.get('address1') or "").lower().split())
+    return (city, addr)
+
+def iter_crawl_data(store_path=store.STORE_PATH, stats=None, legacy_json=store.LEGACY_JSON_PATH):
+    """Yields hardcoded then crawled entries, cleaned, skipping (city, address) dupes."""
+    seen_keys = set()
+    stats = stats if stats is not None else {}
+    stats.setdefault("dupes", 0)
+
+    def sources():
+        yield from baseline_data.data_json_hardcoded
+        with store.RecordStore(store_path) as record_store:
+            # First start after the move to the store, bring the old log_data file over once
+            record_store.migrate_legacy_json(legacy_json)
+            for batch in record_store.iter_records():
+                yield from batch
+
+    for entry in sources():
+        if not isinstance(entry, dict):
+            continue
         entry = clean_entry(entry)  # Clean the entry
-        city = entry['city']
-        addr = entry['address1']
-
-        pair = [city, addr]
-
-        if pair not in city_addr_pairs:
-            combined_data.append(entry)
-            city_addr_pairs.append(pair)
-        else:
-            dupes+=1
-
-    # Add data from the file if it exists
-    if os.path.exists(filepath) and os.path.getsize(filepath) > 0:
-        with open(filepath, "r") as file:
-            try:
-                file_data = json.load(file)
-                if isinstance(file_data, list):
-                    for entry in file_data:
-                        entry = clean_entry(entry)  # Clean the entry
-                        city = entry['city']
-                        addr = entry['address1']
-
-                        pair = [city, addr]
-                        if pair not in city_addr_pairs:
-                            combined_data.append(entry)
-                            city_addr_pairs.append(pair)
-                        else:
-                            dupes+=1
-                else:
-                    print("Warning: JSON data in file is not a list.")
-            except json.JSONDecodeError:
-                print("Warning: JSON decoding failed. Using only hardcoded data.")
-
+        key = record_key(entry)
+        if key in seen_keys:
+            stats["dupes"] += 1
+            continue
+        seen_keys.add(key)
+        yield entry
+
+def load_crawl_data(store_path=store.STORE_PATH):
+    """Loads data from the record store and combines it with hardcoded data."""
+    stats = {}
+    combined_data = list(iter_crawl_data(store_path, stats))
     print("combined_data:", len(combined_data))
-    print("dupes", dupes)
+    print("dupes", stats["dupes"])
     return combined_data
 
+def load_in_background(out_queue, store_path=store.STORE_PATH, batch_size=500):
+    """Runs on a thread, pushes batches of entries onto out_queue and None once everything is loaded."""
+    # data.csv is not touched here, it is only written by python store.py export
+    stats = {}
+    batch = []
+    loaded = 0
+    for entry in iter_crawl_data(store_path, stats):
+        batch.append(entry)
+        if len(batch) >= batch_size:
+            out_queue.put(batch)
+            loaded += len(batch)
+            batch = []
+    if batch:
+        out_queue.put(batch)
+        loaded += len(batch)
+    out_queue.put(None)
+    print("combined_data:", loaded)
+    print("dupes", stats["dupes"])
+
+def progress_text(progress):
+    return f"{progress['records_per_min']:.0f} records/min, {metrics.format_eta(progress['eta_seconds'])}"
+
+class RecordView:
+    """Read only list-like view of crawl_data through an array of record ids, what the row pool reads from."""
+    def __init__(self, records, ids):
+        self.records = records
+        self.ids = ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        return self.records[self.ids[index]]
+
 # Initialize the main application window
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("blue")
@@ -85,6 +120,7 @@ class App(ctk.CTk):
         self.geometry("1500x600")
         self.shutdown_event = shutdown_event  # Event for controlled shutdown
         self.progress_queue = Queue()
+        self.first_progress_queue = Queue()  # Same kind of updates, from the first crawler
         
         # Configure grid for resizing
         self.columnconfigure(0, weight=2)
@@ -92,11 +128,24 @@ class App(ctk.CTk):
         self.columnconfigure(2, weight=1)
         self.rowconfigure(1, weight=1)
         
-        # Initialize and load data
-        self.crawl_data = load_crawl_data()
-        self.filtered_data = self.crawl_data  # Use crawl_data directly without initial filtering
-        self.display_data = []  # Stores currently displayed data
-        self.current_batch = 0  # Track the current batch for pagination
+        # Data is streamed in by a background thread, the window shows up right away and fills in
+        self.crawl_data = []
+        self.loaded_queue = Queue()
+        self.loading_done = False
+        self.record_queue = Queue()  # Batches of records the crawlers just wrote
+        self.record_keys = {}  # record_key -> its record id, for everything in crawl_data
+        # Record ids everywhere below are indexes into crawl_data
+        self.search_index = search_index.SearchIndex()
+        self.search_after_id = None
+        self.search_term = ""
+        self.search_mask = None  # Bool per record matching the search, None when there is no search
+        self.masks = filter_masks.MissingMasks()
+        self.filters_applied = False  # crawl_data is shown unfiltered until a filter checkbox is touched
+        self.sort_keys = sort_keys.SortCache()  # Typed sort keys and cached sorted orders
+        self.active_sort = None  # (field, ascending) once a sort button is pressed
+        self.set_visible_ids(np.zeros(0, dtype=np.int64))
+        self.row_pool = []  # Fixed set of row widgets that get rebound while scrolling
+        self.first_visible = 0  # Index in filtered_data shown in the top row
         self.sort_order = {  # Default sort order (None: unsorted, True: ascending, False: descending)
             "owner_name": None,
             "license_number": None,
@@ -108,6 +157,10 @@ class App(ctk.CTk):
         self.setup_ui()
         self.load_data()  # Load the initial batch of data
 
+        self.load_thread = threading.Thread(target=load_in_background, args=(self.loaded_queue,), daemon=True)
+        self.load_thread.start()
+        self.after(INGEST_POLL_MS, self.poll_loaded_data)
+
         # Start crawl thread in the background, set as daemon
         self.crawl_thread = threading.Thread(target=self.start_crawl, daemon=True)
         self.crawl_thread.start()
@@ -119,21 +172,24 @@ class App(ctk.CTk):
         """Sets up the main UI elements."""
         # Search and Filter Section
         self.search_var = ctk.StringVar()
-        self.search_entry = ctk.CTkEntry(self, textvariable=self.search_var, width=600, placeholder_text="Search by name")
+        self.search_entry = ctk.CTkEntry(self, textvariable=self.search_var, width=600, placeholder_text="Search by name, city, license or phone")
         self.search_entry.grid(row=0, column=0, padx=20, pady=20, columnspan=2, sticky="ew")
         
         self.search_button = ctk.CTkButton(self, text="Search", command=self.search, width=100)
         self.search_button.grid(row=0, column=2, padx=10, pady=20, sticky="e")
+        self.search_var.trace_add("write", self.on_search_typed)
         
         # Data Display Frame with Scrollbar
         self.scrollbar = tk.Scrollbar(self, orient="vertical")
         self.scrollbar.grid(row=1, column=2, sticky="ns", padx=(0, 10))
 
-        self.data_frame = ctk.CTkScrollableFrame(self, width=700, height=400)
+        self.data_frame = ctk.CTkFrame(self, width=700, height=400)
         self.data_frame.grid(row=1, column=0, columnspan=2, padx=20, pady=10, sticky="nsew")
-        self.scrollbar.config(command=self.data_frame._parent_canvas.yview)
-        self.data_frame._parent_canvas.config(yscrollcommand=self.scrollbar.set)
-        self.data_frame.bind("<MouseWheel>", self.on_scroll)
+        self.data_frame.columnconfigure(0, weight=1)
+        self.data_frame.grid_propagate(False)  # Rows must not resize the frame, the frame decides how many rows fit
+        self.scrollbar.config(command=self.on_scrollbar)
+        self.bind_scroll(self.data_frame)
+        self.data_frame.bind("<Configure>", self.resize_row_pool)
 
         # Side HUD Panel
         self.hud_frame = ctk.CTkFrame(self, width=280, height=400)
@@ -194,14 +250,12 @@ class App(ctk.CTk):
         self.first_crawler_button.grid(row=4, column=0, padx=20, pady=(20, 0))
 
     def sort_data(self, field, ascending):
-        """Sorts data based on the specified field and order, treating None as empty strings for comparison."""
-        self.filtered_data.sort(
-            key=lambda x: (x.get(field) is None, x.get(field, "")),  # Sorts None values to the end
-            reverse=not ascending
-        )
-        self.current_batch = 0
-        self.load_data()
-        # Update sort order to keep track
+        """Sorts the view by field, empty values go last. Filters and search keep applying on top of the sort."""
+        self.active_sort = (field, ascending)
+        self.refresh_view()
+        # Update sort order to keep track, only one field sorts at a time
+        for key in self.sort_order:
+            self.sort_order[key] = None
         self.sort_order[field] = ascending
 
     def run_first_crawler(self):
@@ -210,25 +264,36 @@ class App(ctk.CTk):
         self.progress_label2.configure(text="Running first crawler...")
 
         def start_crawler():
-            first_site.main()  # Start the first crawler
-            self.first_crawler_button.configure(state="normal", text="Run First Crawler")
-            self.progress_label2.configure(text="Finished first crawler")
+            first_site.main(record_queue=self.record_queue, progress_queue=self.first_progress_queue)  # Start the first crawler
+            self.first_progress_queue.put(1)
 
         # Run the first crawler in a background thread
         threading.Thread(target=start_crawler, daemon=True).start()
+        self.after(100, self.poll_first_progress)
+
+    def poll_first_progress(self):
+        while not self.first_progress_queue.empty():
+            progress = self.first_progress_queue.get()
+            if not isinstance(progress, dict):
+                self.first_crawler_button.configure(state="normal", text="Run First Crawler")
+                self.progress_label2.configure(text="Finished first crawler")
+                return
+            self.progress_label2.configure(text=f"First crawler {progress_text(progress)}")
+        self.after(100, self.poll_first_progress)
 
     def start_crawl(self):
-        second_site.main(self.progress_queue)
+        second_site.main(self.progress_queue, record_queue=self.record_queue)
 
     def simulate_crawl(self):
         """Updates the progress bar based on the progress from second_site."""
-        start_time = time.time()
         try:
             while not self.progress_queue.empty():
-                progress = self.progress_queue.get()
+                update = self.progress_queue.get()
+                # second_site sends dicts with the measured rate, a bare number is still accepted (the final 1)
+                progress = update["progress"] if isinstance(update, dict) else update
                 self.progress_bar.set(progress)
-                time_elapsed = int(time.time() - start_time)
-                self.time_label.configure(text=f"30-60 minutes to complete...")
+                if isinstance(update, dict):
+                    self.time_label.configure(text=progress_text(update))
                 self.progress_label.configure(text=f"Second Crawler running... {int((progress * 100) +1)}%")
 
                 if progress >= 1.0:
@@ -239,109 +304,237 @@ class App(ctk.CTk):
             print(f"Error in simulate_crawl: {e}")
             self.progress_label.configure(text="Error occurred during crawl")
 
+    def ingest_batch(self, batch):
+        """
+        Adds a batch to crawl_data and every index. A record already shown (same record_key) is replaced where it
+        is, a crawler re-publishes a license when the store updated it. Returns how many were added or replaced.
+        """
+        start = len(self.crawl_data)
+        fresh = []
+        replaced = {}
+        for entry in batch:
+            if not isinstance(entry, dict):
+                continue
+            entry = clean_entry(dict(entry))
+            key = record_key(entry)
+            record_id = self.record_keys.get(key)
+            if record_id is None:
+                self.record_keys[key] = start + len(fresh)
+                fresh.append(entry)
+            elif record_id >= start:
+                fresh[record_id - start] = entry  # Twice in this batch, the later one wins
+            else:
+                replaced[record_id] = entry
+
+        for record_id, entry in replaced.items():
+            self.replace_record(record_id, entry)
+        if fresh:
+            self.add_records(fresh)
+        # Sorted, poll_loaded_data rebuilds the view once per tick anyway
+        if replaced and self.active_sort is None:
+            # A replaced record can start or stop passing the filters and search
+            self.set_visible_ids(self.compute_visible_ids())
+        elif fresh and self.active_sort is None:
+            self.set_visible_ids(np.concatenate((self.visible_ids, self.compute_visible_ids(start))))
+        return len(fresh) + len(replaced)
+
+    def replace_record(self, record_id, entry):
+        self.crawl_data[record_id] = entry
+        self.search_index.replace(record_id, entry)
+        self.masks.replace(record_id, entry)
+        self.sort_keys.replace(record_id, entry)
+        if self.search_mask is not None:
+            self.search_mask[record_id] = self.search_index.matches(record_id, self.search_term)
+
+    def add_records(self, fresh):
+        start = len(self.crawl_data)
+        self.crawl_data.extend(fresh)
+        self.search_index.add_many(fresh)
+        self.masks.add_many(fresh)
+        self.sort_keys.add_many(fresh)
+        if self.search_mask is not None:
+            # New records are checked against the active search using the text the index already built
+            new_matches = [self.search_index.matches(record_id, self.search_term) for record_id in range(start, len(self.crawl_data))]
+            self.search_mask = np.concatenate((self.search_mask, np.array(new_matches, dtype=bool)))
+
+    def poll_loaded_data(self):
+        """Moves batches from the loader thread and the crawlers into the view, never for longer than INGEST_BUDGET_MS a tick."""
+        deadline = time.perf_counter() + INGEST_BUDGET_MS / 1000
+        received = 0
+        # Saved data first so crawler records dont jump ahead of it, then whatever the crawlers just wrote
+        while not self.loading_done and not self.loaded_queue.empty() and time.perf_counter() < deadline:
+            batch = self.loaded_queue.get()
+            if batch is None:
+                self.loading_done = True
+                logging.info(f"Finished loading {len(self.crawl_data)} entries.")
+                break
+            received += self.ingest_batch(batch)
+        while not self.record_queue.empty() and time.perf_counter() < deadline:
+            received += self.ingest_batch(self.record_queue.get())
+
+        if received and self.active_sort is not None:
+            # New records belong somewhere in the middle, the cached order takes them in without a full re-sort
+            self.set_visible_ids(self.compute_visible_ids())
+
+        # Keeps the scroll position, unsorted this only fills empty slots and moves the scrollbar
+        if received:
+            self.render_rows()
+
+        # Keeps polling for the life of the window, the crawlers can publish at any time
+        self.after(INGEST_POLL_MS, self.poll_loaded_data)
+
+    def set_visible_ids(self, ids):
+        self.visible_ids = ids
+        self.filtered_data = RecordView(self.crawl_data, ids)
+
+    def active_filter_fields(self):
+        if not self.filters_applied:
+            return []
+        return [field for field, var in self.filter_vars.items() if var.get()]
+
+    def compute_visible_ids(self, start=0):
+        """Ids from start onwards that pass the checked filters and the active search, all array ops."""
+        keep = self.masks.keep_mask(self.active_filter_fields(), start)
+        if self.search_mask is not None:
+            keep &= self.search_mask[start:]
+        if self.active_sort is not None and start == 0:
+            # Walk the sorted order and keep what passes, so the view stays sorted
+            order = self.sort_keys.order(*self.active_sort)
+            return order[keep[order]]
+        return np.flatnonzero(keep) + start
+
+    def refresh_view(self):
+        self.set_visible_ids(self.compute_visible_ids())
+        self.load_data()
+
     def apply_filters(self):
         logging.info("Applying filters to data.")
-        filtered_data = []
-        count = {"1":0, "2":0, "3":0,"4":0,  "good":0}
-        for entry in self.crawl_data:
-            exclude = False
-            for field, var in self.filter_vars.items():
-                if not var.get():
-                    continue
-
-                item = entry.get(field)
-                if item == "":
-                    count['1'] +=1
-                    exclude = True
-                    break
-        
-                if item == "n/a" or item == "N/A":
-                    count['4'] +=1
-                    exclude = True
-                    break
-
-                if item == None:
-                    count['2'] +=1
-                    exclude = True
-                    break
-
-                if item == "null":
-                    count['3'] +=1
-                    exclude = True
-                    break
-
-            if not exclude:
-                count['good'] +=1
-                filtered_data.append(entry)
-
-        self.filtered_data = filtered_data
-        self.current_batch = 0  # Reset pagination for new filtered data
+        self.filters_applied = True
+        self.refresh_view()
         logging.info(f"Number of entries after filtering: {len(self.filtered_data)}")
-        self.load_data()
-
-    def load_data(self, append=False):
-        start_index = self.current_batch * BATCH_SIZE
-        end_index = start_index + BATCH_SIZE
-        visible_batch = self.filtered_data[start_index:end_index]
-
-        if not append:
-            for widget in self.data_frame.winfo_children():
-                widget.destroy()
-            self.display_data = []
 
+    def build_row(self):
+        """One reusable row, its widgets get rebound to whatever entry scrolls into its slot."""
+        row = {"frame": ctk.CTkFrame(self.data_frame, corner_radius=10)}
+        frame = row["frame"]
+        row["name"] = ctk.CTkLabel(frame, font=("Arial", 14, "bold"))
+        row["name"].grid(row=0, column=0, padx=10, pady=5, sticky="w")
+        row["location"] = ctk.CTkLabel(frame, font=("Arial", 12))
+        row["location"].grid(row=2, column=1, padx=10, pady=5, sticky="w")
+        row["license"] = ctk.CTkLabel(frame, font=("Arial", 12))
+        row["license"].grid(row=1, column=0, padx=10, pady=5, sticky="w")
+        row["status"] = ctk.CTkLabel(frame, font=("Arial", 12))
+        row["status"].grid(row=1, column=1, padx=10, pady=5, sticky="w")
+        row["phone"] = ctk.CTkLabel(frame, font=("Arial", 12))
+        row["phone"].grid(row=2, column=0, padx=10, pady=5, sticky="w")
+        row["expiration_date"] = ctk.CTkLabel(frame, font=("Arial", 12))
+        row["expiration_date"].grid(row=3, column=0, padx=10, pady=5, sticky="w")
+        # Add the clickable "link" button for current_url
+        row["link"] = ctk.CTkButton(frame, text="Link", width=60)
+        row["link"].grid(row=3, column=1, padx=10, pady=5, sticky="w")
+
+        for widget in (frame, row["name"], row["location"], row["license"], row["status"], row["phone"], row["expiration_date"]):
+            self.bind_scroll(widget)
+        return row
+
+    def bind_row(self, row, entry, index):
         colors = ["#2E2E2E", "#393939"]
-
-        for index, entry in enumerate(visible_batch):
-            entry_frame = ctk.CTkFrame(self.data_frame, corner_radius=10, fg_color=colors[(index + len(self.display_data)) % 2])
-            entry_frame.pack(fill="x", padx=5, pady=5)
-            
-            name_label = ctk.CTkLabel(entry_frame, text=f"Name: {entry.get('owner_name', 'N/A')}", font=("Arial", 14, "bold"))
-            name_label.grid(row=0, column=0, padx=10, pady=5, sticky="w")
-
-            location_label = ctk.CTkLabel(entry_frame, text=f"Location: {entry.get('city', 'N/A')}, {entry.get('state', 'N/A')}", font=("Arial", 12))
-            location_label.grid(row=2, column=1, padx=10, pady=5, sticky="w")
-
-            license_label = ctk.CTkLabel(entry_frame, text=f"License: {entry.get('license_number', 'N/A')}", font=("Arial", 12))
-            license_label.grid(row=1, column=0, padx=10, pady=5, sticky="w")
-
-            status_label = ctk.CTkLabel(entry_frame, text=f"Type: {entry.get('business_type', 'N/A')}", font=("Arial", 12))
-            status_label.grid(row=1, column=1, padx=10, pady=5, sticky="w")
-
-            phone_label = ctk.CTkLabel(entry_frame, text=f"Phone: {entry.get('phone_number', 'N/A')}", font=("Arial", 12))
-            phone_label.grid(row=2, column=0, padx=10, pady=5, sticky="w")
-
-            expiration_date_label = ctk.CTkLabel(entry_frame, text=f"Expiration Date: {entry.get('expiration_date', 'N/A')}", font=("Arial", 12))
-            expiration_date_label.grid(row=3, column=0, padx=10, pady=5, sticky="w")
-            
-            # Add the clickable "link" button for current_url
-            current_url = entry.get('current_url', None)
-            if current_url:
-                link_button = ctk.CTkButton(
-                    entry_frame, text="Link", width=60,
-                    command=lambda url=current_url: webbrowser.open(url)
-                )
-                link_button.grid(row=3, column=1, padx=10, pady=5, sticky="w")
-
-            self.display_data.append(entry)
-        
-        self.current_batch += 1
+        row["frame"].configure(fg_color=colors[index % 2])
+        row["name"].configure(text=f"Name: {entry.get('owner_name', 'N/A')}")
+        row["location"].configure(text=f"Location: {entry.get('city', 'N/A')}, {entry.get('state', 'N/A')}")
+        row["license"].configure(text=f"License: {entry.get('license_number', 'N/A')}")
+        row["status"].configure(text=f"Type: {entry.get('business_type', 'N/A')}")
+        row["phone"].configure(text=f"Phone: {entry.get('phone_number', 'N/A')}")
+        row["expiration_date"].configure(text=f"Expiration Date: {entry.get('expiration_date', 'N/A')}")
+
+        current_url = entry.get('current_url', None)
+        if current_url:
+            row["link"].configure(command=lambda url=current_url: webbrowser.open(url))
+            row["link"].grid()
+        else:
+            row["link"].grid_remove()
+
+    def load_data(self):
+        """Jumps back to the top of filtered_data, used whenever the filter, search or sort changes."""
+        self.first_visible = 0
+        self.render_rows()
+
+    def render_rows(self):
+        # Only the pool of rows exists, however long filtered_data is
+        total = len(self.filtered_data)
+        self.first_visible = max(0, min(self.first_visible, total - len(self.row_pool)))
+        for slot, row in enumerate(self.row_pool):
+            index = self.first_visible + slot
+            if index < total:
+                self.bind_row(row, self.filtered_data[index], index)
+                row["frame"].grid(row=slot, column=0, padx=5, pady=5, sticky="ew")
+            else:
+                row["frame"].grid_remove()
+
+        if total:
+            self.scrollbar.set(self.first_visible / total, min(1.0, (self.first_visible + len(self.row_pool)) / total))
+        else:
+            self.scrollbar.set(0, 1)
+
+    def resize_row_pool(self, event=None):
+        wanted = max(1, self.data_frame.winfo_height() // ROW_HEIGHT)
+        if wanted == len(self.row_pool):
+            return
+        while len(self.row_pool) < wanted:
+            self.row_pool.append(self.build_row())
+        while len(self.row_pool) > wanted:
+            self.row_pool.pop().get("frame").destroy()
+        self.render_rows()
+
+    def bind_scroll(self, widget):
+        widget.bind("<MouseWheel>", self.on_scroll)
+        widget.bind("<Button-4>", self.on_scroll)  # Linux reports the wheel as buttons 4/5
+        widget.bind("<Button-5>", self.on_scroll)
 
     def on_scroll(self, event=None):
-        scroll_direction = -1 if event.delta > 0 else 1
-        scroll_position = self.scrollbar.get()[1]
-        if scroll_position >= SCROLL_THRESHOLD and scroll_direction > 0:
-            if self.current_batch * BATCH_SIZE < len(self.filtered_data):
-                self.load_data(append=True)
+        if getattr(event, "num", None) == 4 or getattr(event, "delta", 0) > 0:
+            scroll_direction = -1
+        else:
+            scroll_direction = 1
+        self.scroll_to(self.first_visible + scroll_direction)
+
+    def on_scrollbar(self, action, amount, unit=None):
+        # tk.Scrollbar calls back with ("moveto", fraction) or ("scroll", n, "units"/"pages")
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * len(self.filtered_data)))
+        elif action == "scroll":
+            step = len(self.row_pool) if unit == "pages" else 1
+            self.scroll_to(self.first_visible + int(amount) * step)
+
+    def scroll_to(self, index):
+        index = max(0, min(index, len(self.filtered_data) - len(self.row_pool)))
+        if index != self.first_visible:
+            self.first_visible = index
+            self.render_rows()
+
+    def on_search_typed(self, *args):
+        # Debounce, only search once typing pauses
+        if self.search_after_id is not None:
+            self.after_cancel(self.search_after_id)
+        self.search_after_id = self.after(SEARCH_DEBOUNCE_MS, self.run_debounced_search)
+
+    def run_debounced_search(self):
+        self.search_after_id = None
+        self.search()
 
     def search(self):
-        search_term = self.search_var.get().lower()
-        matching_entries = [
-            entry for entry in self.crawl_data
-            if entry.get("owner_name") and search_term in entry["owner_name"].lower()
-        ]
-        self.filtered_data = matching_entries
-        self.current_batch = 0
-        self.load_data()
+        if self.search_after_id is not None:
+            # Search button pressed while a debounced search was still pending
+            self.after_cancel(self.search_after_id)
+            self.search_after_id = None
+        self.search_term = search_index.normalize_query(self.search_var.get())
+        if not self.search_term:
+            self.search_mask = None
+        else:
+            self.search_mask = np.zeros(len(self.crawl_data), dtype=bool)
+            self.search_mask[self.search_index.search(self.search_term)] = True
+        # Filters and search combine, neither one rescans the records
+        self.refresh_view()
 
     def cleanup(self):
         print("Stopping crawling process...")
@@ -355,11 +548,7 @@ def signal_handler(sig, frame):
     sys.exit(0)
 
 if __name__ == "__main__":
-    load_crawl_data(filepath="./logs/crawl_data.json")
-    
-    csv_converter.update_csv_with_json(load_crawl_data("./logs/crawl_data.json"))
-    csv_converter.update_csv_with_json(hard_json.data_json_hardcoded)
-
+    # Loading (and the csv refresh that used to run here) happens on the App's loader thread now
     shutdown_event = threading.Event()
 
     # Register the signal handler for graceful shutdown
@@ -1,16 +1,21 @@
 # -*- mode: python ; coding: utf-8 -*-
+import sys
+sys.path.insert(0, SPECPATH)
+import baseline_data
 
+# Builds data/baseline.json.gz from hard_json.py if needed, stops here if neither is around
+baseline_data.ensure_built()
 
 a = Analysis(
     ['gui.py'],
     pathex=[],
     binaries=[],
-    datas=[],
+    datas=[('data/baseline.json.gz', 'data')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=['hard_json'],
     noarchive=False,
     optimize=0,
 )
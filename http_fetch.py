@@ -0,0 +1,49 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+'''
+ONCE THE CAPTCHA IS DONE IN THE BROWSER WE DONT NEED THE BROWSER ANYMORE, JUST ITS COOKIES
+'''
+DEFAULT_TIMEOUT = 30
+
+def get_driver_cookies(driver):
+    """Grabs the cookies and user agent from the selenium session so a plain http session looks the same to the site."""
+    cookies = driver.get_cookies()
+    try:
+        user_agent = driver.execute_script("return navigator.userAgent;")
+    except Exception as e:
+        print(f"Could not read user agent from driver: {e}")
+        user_agent = None
+    return cookies, user_agent
+
+def build_session(cookies, user_agent=None, pool_size=4, retries=3):
+    """Builds a pooled requests session carrying the browser cookies."""
+    session = requests.Session()
+
+    retry = Retry(
+        total=retries,
+        backoff_factor=1,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET",),
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    if user_agent:
+        session.headers["User-Agent"] = user_agent
+
+    for cookie in cookies:
+        session.cookies.set(
+            cookie["name"],
+            cookie["value"],
+            domain=cookie.get("domain"),
+            path=cookie.get("path", "/"),
+        )
+    return session
+
+def fetch_html(session, url, timeout=DEFAULT_TIMEOUT):
+    """Fetches a page and returns the raw html, raises on http errors so callers can retry or back off."""
+    response = session.get(url, timeout=timeout)
+    response.raise_for_status()
+    return response.text
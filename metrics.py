@@ -0,0 +1,101 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+'''
+PER STAGE CRAWL TIMINGS, ONE JSON LINE PER MEASUREMENT IN ./logs/metrics.jsonl, PLUS THE THROUGHPUT/ETA THE GUI SHOWS
+    {"ts": 1718000000.1, "site": "second_site", "stage": "navigation", "seconds": 0.412, "profile": "lean", "page": 3, "row": 17}
+Stages: navigation, wait, soup, extract, store_write (the old log write + csv write)
+'''
+METRICS_PATH = './logs/metrics.jsonl'
+
+class CrawlMetrics:
+    """Thread safe, the browser thread, parse workers and the writer thread all report into one of these."""
+    def __init__(self, site, path=METRICS_PATH, flush_every=50, tags=None):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.site = site
+        self.tags = tags or {}  # Added to every line, eg {"profile": "lean"} to compare runs
+        self.path = path
+        self.flush_every = flush_every
+        self.lock = threading.Lock()
+        self.file = open(path, 'a', encoding='utf-8')
+        self.pending = 0
+        self.started = time.monotonic()
+        self.records = 0
+        self.first_done = None  # Where progress started, a resumed crawl shouldnt count the skipped part as throughput
+        self.first_done_at = None
+        self.stages = {}
+
+    def record(self, stage, seconds, **fields):
+        line = json.dumps({"ts": round(time.time(), 3), "site": self.site, "stage": stage, "seconds": round(seconds, 4), **self.tags, **fields})
+        with self.lock:
+            self.stages.setdefault(stage, []).append(seconds)
+            self.file.write(line + "\n")
+            self.pending += 1
+            if self.pending >= self.flush_every:
+                self.file.flush()
+                self.pending = 0
+
+    @contextmanager
+    def stage(self, stage, **fields):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start, **fields)
+
+    def count_records(self, count):
+        with self.lock:
+            self.records += count
+
+    def progress(self, done, total):
+        """What goes on progress_queue: fraction done, records/minute written, and seconds left at the measured rate."""
+        now = time.monotonic()
+        elapsed = now - self.started
+        with self.lock:
+            if self.first_done is None:
+                self.first_done, self.first_done_at = done, now
+            records = self.records
+        progress = min(1.0, done / total) if total else 0.0
+        measured = now - self.first_done_at
+        rate = (done - self.first_done) / measured if measured > 0 else 0.0
+        eta = (total - done) / rate if rate > 0 and total else None
+        return {
+            "progress": progress,
+            "done": done,
+            "total": total,
+            "records_per_min": records / elapsed * 60 if elapsed > 0 else 0.0,
+            "eta_seconds": eta,
+        }
+
+    def summary(self):
+        with self.lock:
+            stages = {stage: sorted(times) for stage, times in self.stages.items()}
+        out = {}
+        for stage, times in stages.items():
+            out[stage] = {
+                "count": len(times),
+                "total_s": round(sum(times), 2),
+                "mean_ms": round(sum(times) / len(times) * 1000, 1),
+                "p95_ms": round(times[min(len(times) - 1, int(len(times) * 0.95))] * 1000, 1),
+            }
+        return out
+
+    def close(self):
+        with self.lock:
+            if self.file.closed:
+                return
+            self.file.close()
+        print(f"{self.site.upper()} STAGE TIMINGS:")
+        for stage, stats in self.summary().items():
+            print(f"  {stage:<12} {stats}")
+
+def format_eta(seconds):
+    if seconds is None:
+        return "estimating..."
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}h {minutes}m left"
+    return f"{minutes}m {seconds}s left"
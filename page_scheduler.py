@@ -0,0 +1,123 @@
+import threading
+import queue
+from collections import deque
+import rate_limiter
+'''
+SPLITS THE i= OFFSETS INTO RANGES AND FETCHES THEM ON A FEW WORKERS AT ONCE, RESULTS COME BACK IN OFFSET ORDER
+'''
+def page_offsets(start, total, items_per_page):
+    """Every i= offset the sequential loop would visit, ie start, start+per_page, ... while < total."""
+    return list(range(start, total, items_per_page))
+
+def split_offsets(offsets, pages_per_range):
+    """Chops the offsets into contiguous ranges that workers claim one at a time."""
+    return [offsets[i:i + pages_per_range] for i in range(0, len(offsets), pages_per_range)]
+
+class RangeQueue:
+    """
+    Ranges that workers claim one at a time. A worker that fails puts back only what it had not
+    finished, and claim() keeps the others waiting until every range is actually done, so a range
+    put back late still gets picked up.
+    """
+    def __init__(self, items, per_range):
+        self.ranges = deque(split_offsets(items, per_range))
+        self.in_flight = 0
+        self.cond = threading.Condition()
+
+    def claim(self):
+        """Next range, or None once every range has been finished."""
+        with self.cond:
+            while not self.ranges and self.in_flight:
+                self.cond.wait()
+            if not self.ranges:
+                return None
+            self.in_flight += 1
+            return self.ranges.popleft()
+
+    def finish(self):
+        with self.cond:
+            self.in_flight -= 1
+            self.cond.notify_all()
+
+    def requeue(self, remaining):
+        # To the front, the oldest unfinished pages go first
+        with self.cond:
+            if remaining:
+                self.ranges.appendleft(remaining)
+            self.in_flight -= 1
+            self.cond.notify_all()
+
+    def remaining(self):
+        with self.cond:
+            return [item for item_range in self.ranges for item in item_range]
+
+def fetch_sharded(offsets, url_for_offset, make_fetcher, workers=4, pages_per_range=5, make_limiter=rate_limiter.RateLimiter, keep_going=False):
+    """
+    Generator yielding (offset, result) in offset order.
+
+    url_for_offset(offset) builds the page url (first_site passes replace_i_param).
+
+    make_fetcher() is called once per worker and must return a function url -> result, so every
+    worker gets its own session. Each worker also gets its own limiter from make_limiter(), the
+    politeness budgets are not shared so the total request rate scales with the worker count.
+    If any page fails the exception is raised here, in order, and the other workers are stopped.
+    With keep_going the exception is yielded as that offset's result instead and the workers carry on.
+    """
+    work = queue.Queue()
+    for offset_range in split_offsets(offsets, pages_per_range):
+        work.put(offset_range)
+
+    results = {}
+    cond = threading.Condition()
+    stop = threading.Event()
+
+    def worker():
+        try:
+            fetch = make_fetcher()
+            limiter = make_limiter()
+        except Exception as e:
+            with cond:
+                results["__setup__"] = e
+                cond.notify_all()
+            return
+
+        while not stop.is_set():
+            try:
+                offset_range = work.get_nowait()
+            except queue.Empty:
+                return
+
+            for offset in offset_range:
+                if stop.is_set():
+                    return
+                page_url = url_for_offset(offset)
+                try:
+                    with limiter.request(page_url):
+                        result = fetch(page_url)
+                except Exception as e:
+                    result = e
+                with cond:
+                    results[offset] = result
+                    cond.notify_all()
+                if isinstance(result, Exception) and not keep_going:
+                    return
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(max(1, workers))]
+    for thread in threads:
+        thread.start()
+
+    try:
+        for offset in offsets:
+            with cond:
+                while offset not in results and "__setup__" not in results:
+                    cond.wait()
+                if "__setup__" in results:
+                    raise results["__setup__"]
+                result = results.pop(offset)
+            if isinstance(result, Exception) and not keep_going:
+                raise result
+            yield offset, result
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join(timeout=1)
@@ -0,0 +1,111 @@
+import os
+from datetime import datetime
+import pyarrow as pa
+import pyarrow.parquet as pq
+'''
+TYPED PARQUET EXPORT, SO ANALYTICS GETS REAL DATES AND CATEGORIES INSTEAD OF RE-PARSING EVERY COLUMN OF data.csv AS STRINGS
+    python store.py parquet [path]       (writes ./logs/data.parquet by default)
+'''
+# Both sites spell these differently, first_site keys are the flattened labels off the page
+DATE_FIELDS = ("original Issue Date", "effective_date", "expiration_date")
+CATEGORY_FIELDS = ("business_type", "County", "county_name", "state", "License Type", "license_specialty_1", "license_specialty_2")
+DATE_FORMATS = ("%m/%d/%Y", "%Y-%m-%d")
+
+EMPTY_VALUES = (None, "", "N/A", "n/a", "null")
+
+def parse_date(value):
+    if value in EMPTY_VALUES:
+        return None
+    value = str(value).strip()
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            continue
+    return None
+
+def clean_string(value):
+    if value in EMPTY_VALUES:
+        return None
+    return str(value).strip()
+
+def column_type(field):
+    if field in DATE_FIELDS:
+        return pa.date32()
+    if field in CATEGORY_FIELDS:
+        return pa.dictionary(pa.int32(), pa.string())
+    return pa.string()
+
+def build_schema(fields):
+    return pa.schema([pa.field(field, column_type(field), nullable=True) for field in fields])
+
+class ParquetSink:
+    """
+    Writes records out one row group at a time, only row_group_size records are ever held in memory.
+    The columns are fixed when the file is opened (parquet needs that), fields outside them are dropped.
+    """
+    def __init__(self, path, fields, row_group_size=10000):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.fields = list(fields)
+        self.schema = build_schema(self.fields)
+        self.row_group_size = row_group_size
+        self.buffer = []
+        self.rows_written = 0
+        self.writer = pq.ParquetWriter(path, self.schema, compression="zstd")
+
+    def write(self, new_data):
+        if isinstance(new_data, dict):
+            new_data = [new_data]
+        self.buffer.extend(new_data)
+        if len(self.buffer) >= self.row_group_size:
+            self.flush()
+
+    def _column(self, field):
+        values = [record.get(field) for record in self.buffer]
+        if field in DATE_FIELDS:
+            return pa.array([parse_date(value) for value in values], type=pa.date32())
+        strings = pa.array([clean_string(value) for value in values], type=pa.string())
+        if field in CATEGORY_FIELDS:
+            return strings.dictionary_encode()
+        return strings
+
+    def flush(self):
+        if not self.buffer:
+            return
+        table = pa.Table.from_arrays([self._column(field) for field in self.fields], schema=self.schema)
+        self.writer.write_table(table)
+        self.rows_written += len(self.buffer)
+        self.buffer = []
+
+    def close(self):
+        if self.writer is None:
+            return
+        self.flush()
+        self.writer.close()
+        self.writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def export_store(record_store, path='./logs/data.parquet', row_group_size=10000):
+    """Two passes over the store, one to find every field in use and one to write, neither holds the whole table."""
+    fields = []
+    known = set()
+    for batch in record_store.iter_records(batch_size=row_group_size):
+        for record in batch:
+            for field in record:
+                if field not in known:
+                    known.add(field)
+                    fields.append(field)
+
+    # Written next to the target and swapped in, readers never see a half written file
+    tmp_path = path + '.tmp'
+    with ParquetSink(tmp_path, fields, row_group_size=row_group_size) as sink:
+        for batch in record_store.iter_records(batch_size=row_group_size):
+            sink.write(batch)
+    os.replace(tmp_path, path)
+    print(f"Exported {sink.rows_written} records, {len(fields)} columns to {path}")
@@ -0,0 +1,121 @@
+import threading
+import queue
+from concurrent.futures import ProcessPoolExecutor
+'''
+FETCH -> PARSE -> WRITE AS SEPARATE STAGES SO THE BROWSER THREAD CAN GO TO THE NEXT PAGE WHILE THE LAST ONE IS PARSED AND SAVED
+
+    driver thread:  crawl_pipeline.submit(driver.page_source, meta=offset)   (blocks when the queue is full)
+                    crawl_pipeline.fail(meta, reason)                        (an item that never loaded)
+    parse workers:  records = parse(page_source)
+    writer thread:  write(meta, records, checkpoint_ok), always in submit order
+'''
+_DONE = object()
+
+class CrawlPipeline:
+    def __init__(self, parse, write, parse_workers=2, queue_size=8, use_processes=False):
+        """
+        parse(payload) -> records, runs on the worker pool. With use_processes it has to be picklable
+        (a module level function or a functools.partial of one).
+        write(meta, records, checkpoint_ok) runs on the single writer thread, so it can own files and db connections.
+        Items whose parse failed never reach write. checkpoint_ok goes False for good after the first failed
+        item, a checkpoint is a high water mark so moving it past a failed page would skip that page on --resume.
+        """
+        self.parse = parse
+        self.write = write
+        self.parse_queue = queue.Queue(maxsize=queue_size)
+        self.write_queue = queue.Queue(maxsize=queue_size)
+        self.next_seq = 0
+        self.submit_lock = threading.Lock()  # Several browser threads can submit into one pipeline
+        self.errors = []
+        self.failed = []  # meta of every item that failed to parse or write, in submit order
+        self.closed = False
+        self.executor = ProcessPoolExecutor(max_workers=parse_workers) if use_processes else None
+
+        self.parse_threads = [
+            threading.Thread(target=self._parse_loop, daemon=True) for _ in range(max(1, parse_workers))
+        ]
+        self.writer_thread = threading.Thread(target=self._write_loop, daemon=True)
+        for thread in self.parse_threads:
+            thread.start()
+        self.writer_thread.start()
+
+    def submit(self, payload, meta=None):
+        with self.submit_lock:
+            if self.closed:
+                raise RuntimeError("pipeline is closed")
+            # put() inside the lock so sequence numbers reach the queue in order
+            self.parse_queue.put((self.next_seq, meta, payload))
+            self.next_seq += 1
+
+    def fail(self, meta, reason):
+        """
+        For an item the fetch side gave up on (never loaded, no detail in it). It takes its place in submit
+        order as a failure, so the checkpoint stops before it the same as for a page that failed to parse.
+        """
+        print(f"Skipped {meta}: {reason}")
+        with self.submit_lock:
+            if self.closed:
+                raise RuntimeError("pipeline is closed")
+            self.write_queue.put((self.next_seq, meta, None, False))
+            self.next_seq += 1
+
+    def _parse_loop(self):
+        while True:
+            item = self.parse_queue.get()
+            if item is _DONE:
+                return
+            seq, meta, payload = item
+            try:
+                if self.executor:
+                    records = self.executor.submit(self.parse, payload).result()
+                else:
+                    records = self.parse(payload)
+            except Exception as e:
+                print(f"Parse failed for {meta}: {e}")
+                self.errors.append(e)
+                self.write_queue.put((seq, meta, None, False))
+                continue
+            self.write_queue.put((seq, meta, records, True))
+
+    def _write_loop(self):
+        # Parse workers finish out of order, hold results back until it is their turn
+        pending = {}
+        expected = 0
+        while True:
+            item = self.write_queue.get()
+            if item is _DONE:
+                return
+            seq, meta, records, ok = item
+            pending[seq] = (meta, records, ok)
+            while expected in pending:
+                meta, records, ok = pending.pop(expected)
+                expected += 1
+                if not ok:
+                    self.failed.append(meta)
+                    continue
+                try:
+                    self.write(meta, records, checkpoint_ok=not self.failed)
+                except Exception as e:
+                    print(f"Write failed for {meta}: {e}")
+                    self.errors.append(e)
+                    self.failed.append(meta)
+
+    def close(self):
+        """Drains everything that was submitted, then stops the workers."""
+        if self.closed:
+            return
+        self.closed = True
+        for _ in self.parse_threads:
+            self.parse_queue.put(_DONE)
+        for thread in self.parse_threads:
+            thread.join()
+        self.write_queue.put(_DONE)
+        self.writer_thread.join()
+        if self.executor:
+            self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,112 @@
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+'''
+SHARED PACING FOR BOTH CRAWLERS, SPEEDS UP WHILE THE SITE IS FAST AND BACKS OFF WHEN IT GETS SLOW OR ERRORS
+'''
+# rate is requests per second. The bucket refills at rate and holds at most burst tokens.
+# target_latency is the response time (s) we treat as "healthy", above it we back off.
+DEFAULT_LIMITS = {
+    "rate": 0.5,
+    "min_rate": 0.05,
+    "max_rate": 2.0,
+    "burst": 1,
+    "target_latency": 5.0,
+    "increase": 0.05,
+    "decrease": 0.5,
+}
+
+HOST_LIMITS = {
+    # Oregon has the captcha in front of it, keep it gentle
+    "www4.cbs.state.or.us": {"rate": 0.15, "min_rate": 0.02, "max_rate": 0.5, "target_latency": 8.0},
+    "secure.lni.wa.gov": {"rate": 1.0, "min_rate": 0.1, "max_rate": 4.0, "burst": 2},
+}
+
+def host_of(url_or_host):
+    if "://" in url_or_host:
+        return urlparse(url_or_host).netloc
+    return url_or_host
+
+class HostLimiter:
+    """Token bucket for one host, the refill rate moves additive increase / multiplicative decrease."""
+    def __init__(self, rate, min_rate, max_rate, burst, target_latency, increase, decrease):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.target_latency = target_latency
+        self.increase = increase
+        self.decrease = decrease
+        self.tokens = burst
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def wait(self):
+        """Blocks until a token is free, returns how long it waited."""
+        waited = 0.0
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                sleep_for = (1 - self.tokens) / self.rate
+            time.sleep(sleep_for)
+            waited += sleep_for
+
+    def record(self, latency, ok=True):
+        with self.lock:
+            if ok and latency <= self.target_latency:
+                self.rate = min(self.max_rate, self.rate + self.increase)
+            else:
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+
+class RateLimiter:
+    def __init__(self, host_limits=None, default_limits=None):
+        self.host_limits = HOST_LIMITS if host_limits is None else host_limits
+        self.default_limits = DEFAULT_LIMITS if default_limits is None else default_limits
+        self.hosts = {}
+        self.lock = threading.Lock()
+
+    def for_host(self, url_or_host):
+        host = host_of(url_or_host)
+        with self.lock:
+            if host not in self.hosts:
+                limits = {**self.default_limits, **self.host_limits.get(host, {})}
+                self.hosts[host] = HostLimiter(**limits)
+            return self.hosts[host]
+
+    def wait(self, url_or_host):
+        return self.for_host(url_or_host).wait()
+
+    def record(self, url_or_host, latency, ok=True):
+        self.for_host(url_or_host).record(latency, ok)
+
+    def current_rate(self, url_or_host):
+        return self.for_host(url_or_host).rate
+
+    @contextmanager
+    def request(self, url_or_host):
+        """
+        Waits for a token, then times the block. An exception counts as an error and backs off.
+            with limiter.request(url):
+                driver.get(url)
+        """
+        host_limiter = self.for_host(url_or_host)
+        host_limiter.wait()
+        start = time.monotonic()
+        try:
+            yield host_limiter
+        except Exception:
+            host_limiter.record(time.monotonic() - start, ok=False)
+            raise
+        host_limiter.record(time.monotonic() - start, ok=True)
+
+# One limiter for the whole process so both crawlers share the per host budgets
+shared_limiter = RateLimiter()
@@ -0,0 +1,221 @@
+import argparse
+import html
+import os
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+'''
+LOCAL STAND IN FOR BOTH LICENSE SITES, BUILT FROM THE SAVED PAGES IN bench/fixtures, SO CRAWLS CAN BE LOAD TESTED WITH NO NETWORK
+
+    python replay_server.py --records 5000 --latency-ms 200 --jitter-ms 300 --error-rate 0.02
+    CRAWL_OR_BASE_URL=http://127.0.0.1:8765/exs/all/mylicsearch/ CRAWL_WA_BASE_URL=http://127.0.0.1:8765/verify/ python second_site.py
+
+Oregon:      /exs/all/mylicsearch/index.cfm   search form, then results paged by i= (and items_per_page=) with a Next 25 link
+Washington:  /verify/                          selSearchType + searchButton
+             /verify/results                   itemsTotal, resultsLengthSelect, itemSingleCol rows, nextButton
+             /verify/detail?id=N               WholeLicense + itemLayout
+'''
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench', 'fixtures')
+OR_PREFIX = "/exs/all/mylicsearch/"
+WA_PREFIX = "/verify/"
+
+STRIPE_DIV = re.compile(r'<div class="stripe[01][^"]*">.*?</div>', re.S)
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURE_DIR, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+class Pages:
+    """Every page the server hands out, record n is generated from the fixtures so any number of records can be served."""
+    def __init__(self, records):
+        self.records = records
+        or_html = read_fixture('or_results_page.html')
+        all_divs = STRIPE_DIV.findall(or_html)
+        # The fixture's first entry is a complete one, every served entry is a copy of it with its own values
+        self.or_entry = all_divs[0]
+        self.or_head = or_html.split(all_divs[0], 1)[0]
+        self.or_tail = or_html.rsplit(all_divs[-1], 1)[1]
+        self.wa_detail = read_fixture('wa_detail_page.html')
+
+    def or_search(self):
+        # Same nesting as the live form, first_site.run clicks the submit button by its absolute xpath
+        return f"""<html><head><title>License Search</title></head><body>
+<div id="main"><div><div><div><div>
+  <div>header</div><div>captcha</div>
+  <div><div><form action="index.cfm" method="get">
+    <input type="hidden" name="fuseaction" value="search.search_results">
+    <input type="hidden" name="group_id" value="30">
+    <div><div><div>name</div><div>city</div><div>county</div><div>type</div><div>status</div>
+      <div><input type="submit" value="Search"><input type="reset" value="Clear"></div>
+    </div></div>
+  </form></div></div>
+</div></div></div></div></div>
+</body></html>"""
+
+    def or_entry_html(self, n):
+        entry = self.or_entry
+        for old, new in (
+            ("A ABSOLUTE COMFORT HEATING &amp; COOLING INC", f"REPLAY CONTRACTOR {n} INC"),
+            ("15886 PARK PLACE CT", f"{n} REPLAY ST"),
+            ("503-513-4795", f"503-{n // 10000 % 1000:03d}-{n % 10000:04d}"),
+            ("07/01/2026", f"{n % 12 + 1:02d}/{n % 28 + 1:02d}/{2024 + n % 5}"),
+            ("132407", str(100000 + n)),
+        ):
+            entry = entry.replace(old, new)
+        return entry
+
+    def or_results(self, query):
+        start = max(1, int(query.get("i", ["1"])[0]))
+        per_page = max(1, int(query.get("items_per_page", ["25"])[0]))
+        end = min(self.records, start + per_page - 1)
+        next_query = urlencode({"fuseaction": "search.search_results", "group_id": "30", "i": start + 25})
+        head = re.sub(r"Showing .*? total\)", f"Showing {start} - {end} ({self.records} total)", self.or_head)
+        head = re.sub(r'href="index\.cfm\?[^"]*">Next 25', f'href="index.cfm?{html.escape(next_query)}">Next 25', head)
+        entries = [self.or_entry_html(n) for n in range(start, end + 1)]
+        return head + "\n".join(entries) + self.or_tail
+
+    def wa_home(self):
+        return f"""<html><head><title>Verify</title></head><body>
+<select id="selSearchType"><option>License</option><option>Name</option><option>UBI</option></select>
+<input id="searchText">
+<button id="searchButton" onclick="location.href='{WA_PREFIX}results?' + new URLSearchParams({{type: document.getElementById('selSearchType').value, page: 1, size: 10}})">Search</button>
+</body></html>"""
+
+    def wa_results(self, query):
+        page = max(1, int(query.get("page", ["1"])[0]))
+        size = max(1, int(query.get("size", ["10"])[0]))
+        start = (page - 1) * size + 1
+        end = min(self.records, start + size - 1)
+        options = "".join(
+            f'<option value="{count}"{" selected" if count == size else ""}>{count} items</option>' for count in (10, 25, 50, 100)
+        )
+        rows = "".join(
+            f'<div class="itemSingleCol" onclick="location.href=\'{WA_PREFIX}detail?id={n}\'">'
+            f'<a href="{WA_PREFIX}detail?id={n}">WA REPLAY CONTRACTOR {n} LLC</a></div>\n'
+            for n in range(start, end + 1)
+        )
+        next_url = f"{WA_PREFIX}results?" + urlencode({"page": page + 1, "size": size})
+        return f"""<html><head><title>Verify results</title></head><body>
+<span id="itemsTotal">{self.records}</span>
+<select id="resultsLengthSelect" onchange="location.href='{WA_PREFIX}results?page=1&size=' + this.value">{options}</select>
+<div id="results">
+{rows}</div>
+<button class="nextButton" onclick="location.href='{next_url}'">Next</button>
+</body></html>"""
+
+    def wa_detail_html(self, n):
+        page = self.wa_detail
+        for old, new in (
+            ("EVERGREEN SIDING &amp; GUTTERS LLC", f"WA REPLAY CONTRACTOR {n} LLC"),
+            ("4417 PACIFIC HWY E", f"{n} REPLAY AVE"),
+            ("EVERGSG812LX", f"REPLAY{n:06d}"),
+            ("48211", str(self.records)),
+        ):
+            page = page.replace(old, new)
+        return page
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    server_version = "ReplayServer/1.0"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def send_html(self, status, body):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        server = self.server
+        # Injected slowness and failures, what the rate limiter and retries are supposed to cope with
+        delay = server.latency + random.uniform(0, server.jitter)
+        if delay:
+            time.sleep(delay)
+        if random.random() < server.error_rate:
+            server.count("errors")
+            return self.send_html(503, "<html><body>Service Unavailable</body></html>")
+
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        pages = server.pages
+        if url.path.startswith(OR_PREFIX):
+            server.count("or")
+            if query.get("fuseaction", [""])[0] == "search.search_results":
+                return self.send_html(200, pages.or_results(query))
+            return self.send_html(200, pages.or_search())
+        if url.path == WA_PREFIX or url.path == WA_PREFIX.rstrip("/"):
+            server.count("wa")
+            return self.send_html(200, pages.wa_home())
+        if url.path == WA_PREFIX + "results":
+            server.count("wa")
+            return self.send_html(200, pages.wa_results(query))
+        if url.path == WA_PREFIX + "detail":
+            server.count("wa")
+            n = int(query.get("id", ["0"])[0])
+            if not 1 <= n <= pages.records:
+                return self.send_html(404, "<html><body>No such license</body></html>")
+            return self.send_html(200, pages.wa_detail_html(n))
+        self.send_html(404, "<html><body>Not found</body></html>")
+
+class ReplayServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, records=5000, latency_ms=0, jitter_ms=0, error_rate=0.0, verbose=False):
+        super().__init__(address, ReplayHandler)
+        self.pages = Pages(records)
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.error_rate = error_rate
+        self.verbose = verbose
+        self.lock = threading.Lock()
+        self.counts = {"or": 0, "wa": 0, "errors": 0}
+
+    def count(self, key):
+        with self.lock:
+            self.counts[key] += 1
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+def start_in_background(**kwargs):
+    """For scripts and load tests, returns the running server, call shutdown() on it when done."""
+    server = ReplayServer(("127.0.0.1", kwargs.pop("port", 0)), **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve both license sites locally from the recorded fixtures")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--records", type=int, default=5000, help="licenses each site pretends to have")
+    parser.add_argument("--latency-ms", type=float, default=0, help="added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="random extra latency, 0 to this much")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with a 503")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args()
+
+    server = ReplayServer((args.host, args.port), records=args.records, latency_ms=args.latency_ms,
+                          jitter_ms=args.jitter_ms, error_rate=args.error_rate, verbose=args.verbose)
+    print(f"Serving on {server.base_url}")
+    print(f"  CRAWL_OR_BASE_URL={server.base_url}{OR_PREFIX}")
+    print(f"  CRAWL_WA_BASE_URL={server.base_url}{WA_PREFIX}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print("Requests served:", server.counts)
+
+if __name__ == "__main__":
+    sys.exit(main())
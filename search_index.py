@@ -0,0 +1,101 @@
+import re
+from array import array
+from bisect import bisect_left
+'''
+TRIGRAM INDEX FOR THE GUI SEARCH BOX, BUILT ONCE AT LOAD AND ADDED TO AS NEW RECORDS STREAM IN
+'''
+SEARCH_FIELDS = ("owner_name", "city", "license_number", "phone_number")
+
+# Between fields so a query can never match across the end of one field and the start of the next
+FIELD_SEPARATOR = "\x1f"
+
+NON_DIGITS = re.compile(r"\D")
+
+def searchable_text(entry):
+    parts = []
+    for field in SEARCH_FIELDS:
+        value = entry.get(field)
+        if value in (None, "", "N/A", "n/a", "null"):
+            continue
+        parts.append(" ".join(str(value).lower().split()))
+    # Phone numbers are also indexed digits only so 5035134795 finds 503-513-4795
+    digits = NON_DIGITS.sub("", str(entry.get("phone_number") or ""))
+    if digits:
+        parts.append(digits)
+    return FIELD_SEPARATOR.join(parts)
+
+def normalize_query(term):
+    return " ".join(term.lower().split())
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class SearchIndex:
+    """
+    Record ids are the order records were added in, which is their index in App.crawl_data.
+    Posting lists are arrays of ids so they stay small, and they are sorted for free since ids only grow.
+    """
+    def __init__(self):
+        self.texts = []
+        self.postings = {}
+
+    def __len__(self):
+        return len(self.texts)
+
+    def add(self, entry):
+        record_id = len(self.texts)
+        text = searchable_text(entry)
+        self.texts.append(text)
+        for gram in trigrams(text):
+            posting = self.postings.get(gram)
+            if posting is None:
+                posting = self.postings[gram] = array("I")
+            posting.append(record_id)
+        return record_id
+
+    def add_many(self, entries):
+        for entry in entries:
+            self.add(entry)
+
+    def replace(self, record_id, entry):
+        """A record that changed in place. Trigrams it lost keep the id, the substring check in search drops those."""
+        text = searchable_text(entry)
+        for gram in trigrams(text) - trigrams(self.texts[record_id]):
+            posting = self.postings.get(gram)
+            if posting is None:
+                posting = self.postings[gram] = array("I")
+            # Old id going into the middle, keep the list sorted and dont add it twice
+            at = bisect_left(posting, record_id)
+            if at == len(posting) or posting[at] != record_id:
+                posting.insert(at, record_id)
+        self.texts[record_id] = text
+
+    def matches(self, record_id, term):
+        return term in self.texts[record_id]
+
+    def search(self, term):
+        """Ids of every record with term in one of the search fields, in record order."""
+        term = normalize_query(term)
+        if not term:
+            return list(range(len(self.texts)))
+
+        if len(term) < 3:
+            # Too short for a trigram, a straight scan over the prebuilt texts is still quick
+            return [record_id for record_id, text in enumerate(self.texts) if term in text]
+
+        grams = trigrams(term)
+        postings = []
+        for gram in grams:
+            posting = self.postings.get(gram)
+            if posting is None:
+                return []
+            postings.append(posting)
+
+        # Start from the rarest trigram and narrow down with the next two, then confirm the real substring
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:3]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                return []
+        return sorted(record_id for record_id in candidates if term in self.texts[record_id])
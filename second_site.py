@@ -1,13 +1,24 @@
 import hyperSel
-import hyperSel.log_utilities
-import hyperSel.request_utilities
 import hyperSel.selenium_utilities
 import hyperSel.soup_utilities
 import time
 from selenium.webdriver.support.ui import Select
 import sys
-import hard_json
-import csv_converter
+import baseline_data
+import store
+import rate_limiter
+import waits
+import checkpoint
+import pipeline
+import page_scheduler
+import threading
+import metrics
+import site_urls
+import http_fetch
+import driver_profile
+import functools
+from bs4 import BeautifulSoup, NavigableString, Tag
+from urllib.parse import urljoin
 
 def get_total_items(driver):
     soup = hyperSel.selenium_utilities.get_driver_soup(driver)
@@ -19,212 +30,367 @@ def go_to_page_from_home(driver):
     time.sleep(2)
     hyperSel.selenium_utilities.click_button(driver, '''//*[@id="searchButton"]''')
 
-def get_primary_data(soup):
+# How a field is read off its span
+TEXT = "text"                   # the span's text
+VISIBLE_TEXT = "visible_text"   # the span's text, None when the span is hidden with display: none
+LINK = "link"                   # href of the first <a> inside the span
+VISIBLE_LINK = "visible_link"   # href of <a id=relatedLink> inside the span, None when the span is hidden
+
+HIDDEN_STYLE = "display: none;"
+
+# field name -> span id (or .class for the first span with that class), and how to read it
+PRIMARY_FIELDS = [
+    ("owner_name", "BusinesOwnersName", TEXT),
+    ("owner_first_name", "BusinesOwnersFirstName", TEXT),
+    ("owner_last_name", "BusinesOwnersLastName", TEXT),
+    ("principal_name", "principalName", TEXT),
+    ("doing_business_as", "BusinessDbaName", TEXT),
+    ("address1", "Address1", TEXT),
+    ("unit", ".data-item", TEXT),
+    ("city", "City", TEXT),
+    ("state", "State", TEXT),
+    ("zip", "Zip", TEXT),
+    ("phone_number", "PhoneNumber", TEXT),
+    ("county_name", "CountyName", TEXT),
+    ("ubi_number", "UBINumber", TEXT),
+    ("business_type", "BusinessType", TEXT),
+]
+
+SECONDARY_FIELDS = [
+    ("license_specialty_1", "SpecialtyName1", TEXT),
+    ("license_specialty_2", "SpecialtyName2", VISIBLE_TEXT),
+    ("license_number", "LicenseNumber", TEXT),
+    ("effective_date", "EffectiveDate", TEXT),
+    ("expiration_date", "ExpirationDate", TEXT),
+    ("contractor_registration", "Registration2", TEXT),
+    ("associated_licenses_link", "AssociatedLicensesLink", VISIBLE_LINK),
+    ("fraud_report_link", "FraudLink", LINK),
+    ("license_renewal", "LicenseRenewal", TEXT),
+]
+
+def index_spans(soup):
+    """One pass over the spans, first span per id and per class, like soup.find would return."""
+    spans = {}
+    # Walking descendants directly, find_all's filter machinery costs more than the spans themselves
+    for node in soup.descendants:
+        if type(node) is not Tag or node.name != "span":
+            continue
+        attrs = node.attrs
+        span_id = attrs.get("id")
+        if span_id and span_id not in spans:
+            spans[span_id] = node
+        for class_name in attrs.get("class", ()):
+            spans.setdefault("." + class_name, node)
+    return spans
+
+def span_text(span):
+    # Nearly every field span holds one plain string, only fall back to get_text when it doesnt
+    contents = span.contents
+    if not contents:
+        return ""
+    if len(contents) == 1 and type(contents[0]) is NavigableString:
+        return contents[0].strip()
+    return span.get_text(strip=True)
+
+def read_field(span, kind):
+    if span is None:
+        return None
+    if kind in (VISIBLE_TEXT, VISIBLE_LINK) and span.attrs.get("style") == HIDDEN_STYLE:
+        return None
+    if kind in (TEXT, VISIBLE_TEXT):
+        return span_text(span)
+    if kind == VISIBLE_LINK:
+        link = span.find("a", id="relatedLink")
+    else:
+        link = span.find("a")
+    return (link.get("href") or None) if link else None
+
+def extract_fields(soup, field_specs):
+    if soup is None:
+        return {field: None for field, _, _ in field_specs}
+
+    spans = index_spans(soup)
     data = {}
-    try:
-        owner_name = soup.find("span", id="BusinesOwnersName")
-        data["owner_name"] = owner_name.get_text(strip=True) if owner_name else None
-    except Exception:
-        data["owner_name"] = None
-
-    try:
-        first_name = soup.find("span", id="BusinesOwnersFirstName")
-        data["owner_first_name"] = first_name.get_text(strip=True) if first_name else None
-    except Exception:
-        data["owner_first_name"] = None
-
-    try:
-        last_name = soup.find("span", id="BusinesOwnersLastName")
-        data["owner_last_name"] = last_name.get_text(strip=True) if last_name else None
-    except Exception:
-        data["owner_last_name"] = None
-
-    try:
-        principal_name = soup.find("span", id="principalName")
-        data["principal_name"] = principal_name.get_text(strip=True) if principal_name else None
-    except Exception:
-        data["principal_name"] = None
-
-    try:
-        dba_name = soup.find("span", id="BusinessDbaName")
-        data["doing_business_as"] = dba_name.get_text(strip=True) if dba_name else None
-    except Exception:
-        data["doing_business_as"] = None
-
-    try:
-        address1 = soup.find("span", id="Address1")
-        data["address1"] = address1.get_text(strip=True) if address1 else None
-    except Exception:
-        data["address1"] = None
-
-    try:
-        unit = soup.find("span", class_="data-item")
-        data["unit"] = unit.get_text(strip=True) if unit else None
-    except Exception:
-        data["unit"] = None
-
-    try:
-        city = soup.find("span", id="City")
-        data["city"] = city.get_text(strip=True) if city else None
-    except Exception:
-        data["city"] = None
-
-    try:
-        state = soup.find("span", id="State")
-        data["state"] = state.get_text(strip=True) if state else None
-    except Exception:
-        data["state"] = None
-
-    try:
-        zip_code = soup.find("span", id="Zip")
-        data["zip"] = zip_code.get_text(strip=True) if zip_code else None
-    except Exception:
-        data["zip"] = None
-
-    try:
-        phone_number = soup.find("span", id="PhoneNumber")
-        data["phone_number"] = phone_number.get_text(strip=True) if phone_number else None
-    except Exception:
-        data["phone_number"] = None
-
-    try:
-        county_name = soup.find("span", id="CountyName")
-        data["county_name"] = county_name.get_text(strip=True) if county_name else None
-    except Exception:
-        data["county_name"] = None
-
-    try:
-        ubi_number = soup.find("span", id="UBINumber")
-        data["ubi_number"] = ubi_number.get_text(strip=True) if ubi_number else None
-    except Exception:
-        data["ubi_number"] = None
-
-    try:
-        business_type = soup.find("span", id="BusinessType")
-        data["business_type"] = business_type.get_text(strip=True) if business_type else None
-    except Exception:
-        data["business_type"] = None
-
+    for field, locator, kind in field_specs:
+        try:
+            data[field] = read_field(spans.get(locator), kind)
+        except Exception:
+            data[field] = None
     return data
 
-def grab_secondary_data(soup):
-    data = {}
-
-    try:
-        specialty1 = soup.find("span", id="SpecialtyName1")
-        data["license_specialty_1"] = specialty1.get_text(strip=True) if specialty1 else None
-    except Exception:
-        data["license_specialty_1"] = None
-
-    try:
-        specialty2 = soup.find("span", id="SpecialtyName2")
-        data["license_specialty_2"] = specialty2.get_text(strip=True) if specialty2 and specialty2.get("style") != "display: none;" else None
-    except Exception:
-        data["license_specialty_2"] = None
-
-    try:
-        license_number = soup.find("span", id="LicenseNumber")
-        data["license_number"] = license_number.get_text(strip=True) if license_number else None
-    except Exception:
-        data["license_number"] = None
-
-    try:
-        effective_date = soup.find("span", id="EffectiveDate")
-        data["effective_date"] = effective_date.get_text(strip=True) if effective_date else None
-    except Exception:
-        data["effective_date"] = None
-
-    try:
-        expiration_date = soup.find("span", id="ExpirationDate")
-        data["expiration_date"] = expiration_date.get_text(strip=True) if expiration_date else None
-    except Exception:
-        data["expiration_date"] = None
-
-    try:
-        registration = soup.find("span", id="Registration2")
-        data["contractor_registration"] = registration.get_text(strip=True) if registration else None
-    except Exception:
-        data["contractor_registration"] = None
-
-    try:
-        associated_licenses = soup.find("span", id="AssociatedLicensesLink")
-        if associated_licenses and associated_licenses.get("style") != "display: none;":
-            related_link = associated_licenses.find("a", id="relatedLink")
-            data["associated_licenses_link"] = related_link["href"] if related_link else None
-        else:
-            data["associated_licenses_link"] = None
-    except Exception:
-        data["associated_licenses_link"] = None
+def get_primary_data(soup):
+    return extract_fields(soup, PRIMARY_FIELDS)
 
+def grab_secondary_data(soup):
+    return extract_fields(soup, SECONDARY_FIELDS)
+
+CLICK_ATTEMPTS = 5
+CLICK_BACKOFF = 0.5  # Seconds before the 2nd click attempt, doubled each time after (0.5+1+2+4)
+ITEMS_PER_PAGE = 100
+PAGES_PER_RANGE = 5  # Result pages a pooled browser claims at once
+WORKER_RESTARTS = 3  # New browsers a pooled worker may open after crashes before it stops
+DETAIL_MODES = ("click", "tabs", "http")  # How detail views are opened, see crawl_page
+DETAIL_TABS = 4  # Detail tabs (or http fetches) open at once in the tabs/http modes
+
+# What a checkpoint has to match to be resumed, the crawl always searches by Name with 100 per page
+SEARCH_PARAMS = {"search_type": "Name", "items_per_page": ITEMS_PER_PAGE}
+
+# What click_row can come back with
+CLICKED = "clicked"
+NO_ROW = "no_row"              # the list is up but shorter than i, ie the last page
+CLICK_FAILED = "click_failed"  # row i is there but never took a click
+LIST_GONE = "list_gone"        # the results list itself never came back
+
+def click_row(driver, i):
+    """
+    Waits for row i of the results list and clicks it, re-finding the row if it went stale mid re-render.
+    Backs off between attempts so a list that is still re-rendering gets time to settle.
+    """
+    result = LIST_GONE
+    for attempt in range(CLICK_ATTEMPTS):
+        if attempt:
+            time.sleep(CLICK_BACKOFF * 2 ** (attempt - 1))
+        rows = waits.wait_for(driver, waits.rows_ready(i + 1), "itemSingleCol")
+        if not rows:
+            if waits.row_count(driver):
+                # Rows are there, just not this many
+                return NO_ROW
+            print("RESULTS LIST NOT BACK YET", attempt)
+            result = LIST_GONE
+            continue
+        try:
+            rows[i].click()
+            return CLICKED
+        except Exception as e:
+            print("THIS CLICK FAILED", attempt, e)
+            result = CLICK_FAILED
+    return result
+
+def parse_detail(payload, crawl_metrics=None):
+    # Parse stage of the pipeline, (page source, url) in, one combined record out
+    html, current_url = payload
+    start = time.perf_counter()
+    data_soup = BeautifulSoup(html, "html.parser")
+    soup_done = time.perf_counter()
+    data = grab_secondary_data(data_soup.find(id="WholeLicense"))
+    data2 = get_primary_data(data_soup.find("div", class_="itemLayout"))
+    data["current_url"] = current_url
+    if crawl_metrics:
+        crawl_metrics.record("soup", soup_done - start)
+        crawl_metrics.record("extract", time.perf_counter() - soup_done)
+    return [{**data, **data2}]
+
+def write_detail(record_store, record_queue, crawl_metrics, position, records, save_checkpoint=True, checkpoint_ok=True):
+    # Writer stage, position is the (page_no, row) the record came from
+    written = []
+    start = time.perf_counter()
+    for combined_data in records:
+        if combined_data['address1'] in baseline_data.all_addresses:
+            # dupe
+            record_store.count_skipped("address1")
+        # Store errors are left to raise, the pipeline counts them as a failed write and holds the checkpoint back
+        elif record_store.upsert("second_site", combined_data) != store.UNCHANGED:
+            written.append(combined_data)
+    page_no, row = position
+    crawl_metrics.record("store_write", time.perf_counter() - start, page=page_no, row=row)
+    crawl_metrics.count_records(len(written))
+    if record_queue is not None and written:
+        # Live feed for the gui, only what actually got saved
+        record_queue.put(written)
+    if save_checkpoint and checkpoint_ok:
+        checkpoint.save_checkpoint("second_site", SEARCH_PARAMS, page_no, row=row)
+
+def func(driver, crawl_pipeline, crawl_metrics, page_no, start_row=0):
+    """Clicks through the rows of the current results page, returns how many detail views were submitted."""
+    submitted = 0
+    for i in range(start_row, ITEMS_PER_PAGE):
+        # print("IN PAGE ITER:", i)
+        host_limiter = rate_limiter.shared_limiter.for_host(driver.current_url)
+        host_limiter.wait()
+        list_url = driver.current_url
+        click_start = time.monotonic()
+        clicked = click_row(driver, i)
+        crawl_metrics.record("navigation", time.monotonic() - click_start, page=page_no, row=i)
+
+        # Failed or slow clicks mean the list is not keeping up, so the limiter backs off
+        host_limiter.record(time.monotonic() - click_start, ok=clicked == CLICKED or clicked == NO_ROW)
+        if clicked == NO_ROW:
+            # Last page has less than 100 rows
+            print("NO ROW", i, "ON THIS PAGE, MOVING ON")
+            break
+        # Every row that doesnt make it goes to the pipeline as a failure, later rows then cant move
+        # the checkpoint past it and --resume comes back for it
+        if clicked == LIST_GONE:
+            # Every other row would time out the same way, the checkpoint stops here either way
+            crawl_pipeline.fail((page_no, i), "results list never came back, giving up on the rest of the page")
+            break
+        if clicked == CLICK_FAILED:
+            # One row that would not take a click, the rest of the page is still worth trying
+            crawl_pipeline.fail((page_no, i), "row never took a click")
+            continue
+
+        with crawl_metrics.stage("wait", page=page_no, row=i):
+            ready = waits.wait_for(driver, waits.detail_ready, "WholeLicense+itemLayout")
+        if not ready:
+            crawl_pipeline.fail((page_no, i), "detail view never loaded")
+            # Only go back if the click actually left the list, back() from the list itself would lose it
+            if driver.current_url != list_url or not waits.row_count(driver):
+                with crawl_metrics.stage("navigation", page=page_no, row=i):
+                    driver.back()
+                    waits.wait_for(driver, waits.detail_gone, "back to list")
+                    waits.wait_for(driver, waits.rows_ready(1), "itemSingleCol")
+            continue
+
+        # Only grab the html here, parsing and saving happen off the browser thread
+        crawl_pipeline.submit((driver.page_source, driver.current_url), meta=(page_no, i))
+        submitted += 1
+        with crawl_metrics.stage("navigation", page=page_no, row=i):
+            driver.back()
+            waits.wait_for(driver, waits.detail_gone, "back to list")
+    return submitted
+
+def detail_targets(driver):
+    """
+    Detail urls for every row, read off one snapshot of the results list. None when any row has
+    no link to follow (the rows are click handlers only), the caller falls back to clicking.
+    """
+    soup = BeautifulSoup(driver.page_source, "html.parser")
+    targets = []
+    for row in soup.find_all(class_="itemSingleCol"):
+        link = row.find("a", href=True)
+        if link is None or link["href"].startswith(("#", "javascript:")):
+            return None
+        targets.append(urljoin(driver.current_url, link["href"]))
+    return targets or None
+
+def submit_detail(crawl_pipeline, page_no, i, html, url):
+    if "WholeLicense" not in html:
+        crawl_pipeline.fail((page_no, i), f"no detail at {url}")
+        return False
+    crawl_pipeline.submit((html, url), meta=(page_no, i))
+    return True
+
+def func_tabs(driver, crawl_pipeline, crawl_metrics, page_no, targets, start_row=0, tabs=DETAIL_TABS):
+    """Opens tabs detail targets at a time, they load side by side while the list tab is left alone, no back navigation."""
+    list_handle = driver.current_window_handle
+    host_limiter = rate_limiter.shared_limiter.for_host(driver.current_url)
+    submitted = 0
     try:
-        fraud_link = soup.find("span", id="FraudLink")
-        fraud_url = fraud_link.find("a")["href"] if fraud_link else None
-        data["fraud_report_link"] = fraud_url if fraud_url else None
-    except Exception:
-        data["fraud_report_link"] = None
-
+        for batch_start in range(start_row, len(targets), tabs):
+            opened = []
+            batch_time = time.monotonic()
+            with crawl_metrics.stage("navigation", page=page_no, row=batch_start):
+                for i in range(batch_start, min(batch_start + tabs, len(targets))):
+                    host_limiter.wait()
+                    driver.switch_to.new_window('tab')
+                    # Assigning location returns straight away, so the whole batch loads at once
+                    driver.execute_script("window.location.href = arguments[0];", targets[i])
+                    opened.append((i, driver.current_window_handle))
+
+            ok = True
+            for i, handle in opened:
+                driver.switch_to.window(handle)
+                with crawl_metrics.stage("wait", page=page_no, row=i):
+                    ready = waits.wait_for(driver, waits.detail_ready, "WholeLicense+itemLayout")
+                if ready:
+                    submitted += submit_detail(crawl_pipeline, page_no, i, driver.page_source, driver.current_url)
+                else:
+                    crawl_pipeline.fail((page_no, i), f"detail tab never loaded {targets[i]}")
+                    ok = False
+                driver.close()
+            host_limiter.record((time.monotonic() - batch_time) / max(1, len(opened)), ok=ok)
+            driver.switch_to.window(list_handle)
+    finally:
+        # Whatever happened, leave the driver on the list tab with nothing else open
+        for handle in driver.window_handles:
+            if handle != list_handle:
+                driver.switch_to.window(handle)
+                driver.close()
+        driver.switch_to.window(list_handle)
+    return submitted
+
+def func_http(driver, crawl_pipeline, crawl_metrics, page_no, targets, start_row=0, tabs=DETAIL_TABS):
+    """Fetches the detail targets straight from the server with the browser's cookies, tabs requests at a time."""
+    cookies, user_agent = http_fetch.get_driver_cookies(driver)
+
+    def make_fetcher():
+        session = http_fetch.build_session(cookies, user_agent)
+        return lambda url: http_fetch.fetch_html(session, url)
+
+    rows = list(range(start_row, len(targets)))
+    # Every fetch thread takes its tokens from the shared limiter, the same host budget the click and tabs
+    # modes use, and its latency and errors feed the backoff. keep_going, one bad detail page shouldnt stop the list
+    pages = page_scheduler.fetch_sharded(rows, targets.__getitem__, make_fetcher, workers=tabs, pages_per_range=1,
+                                         make_limiter=lambda: rate_limiter.shared_limiter, keep_going=True)
+    submitted = 0
     try:
-        license_renewal = soup.find("span", id="LicenseRenewal")
-        data["license_renewal"] = license_renewal.get_text(strip=True) if license_renewal else None
-    except Exception:
-        data["license_renewal"] = None
-
-    return data
-
-def func(driver):
-    for i in range(100):
-        # print("IN PAGE ITER:", i)
-        time.sleep(2)
-        attempts = 0
-        while True:
-            if attempts >= 100:
-                break
-            try:
-                row_to_click = hyperSel.selenium_utilities.select_multiple_elements_by_class(driver, "itemSingleCol")[i]
-                row_to_click.click()
-                break
-            except Exception as e:
-                print("THIS CLICK FAILED", attempts)
-                time.sleep(0.5)
-                attempts += 1
-                continue
-            
-        time.sleep(3)
-        data_soup = hyperSel.selenium_utilities.get_driver_soup(driver)
-        data = grab_secondary_data(data_soup.find(id="WholeLicense"))
-        data2 = get_primary_data(data_soup.find("div", class_="itemLayout"))
-        data["current_url"] = driver.current_url
-
-        combined_data = {**data, **data2}
-        try:
-            if combined_data['address1'] in hard_json.all_addresses:
-                # dupe
-                pass
+        fetch_start = time.perf_counter()
+        for i, html in pages:
+            crawl_metrics.record("navigation", time.perf_counter() - fetch_start, page=page_no, row=i)
+            if isinstance(html, Exception):
+                crawl_pipeline.fail((page_no, i), f"detail fetch failed {targets[i]}: {html}")
             else:
-                hyperSel.log_utilities.log_data(combined_data, verbose=False)
-                csv_converter.update_csv_with_json(combined_data)
-        except Exception as e:
-            print(e)
-        driver.back()
+                submitted += submit_detail(crawl_pipeline, page_no, i, html, targets[i])
+            fetch_start = time.perf_counter()
+    finally:
+        pages.close()
+    return submitted
+
+def crawl_page(driver, crawl_pipeline, crawl_metrics, page_no, start_row=0, detail_mode="click", tabs=DETAIL_TABS):
+    """
+    Every detail view on the current results page. click is the original click -> scrape -> back per row,
+    tabs and http read all the row links off one snapshot of the list and never leave it.
+    Returns how many detail views went to the pipeline.
+    """
+    if detail_mode != "click":
+        with crawl_metrics.stage("snapshot", page=page_no):
+            waits.wait_for(driver, waits.rows_ready(1), "itemSingleCol")
+            targets = detail_targets(driver)
+        if targets:
+            if detail_mode == "tabs":
+                return func_tabs(driver, crawl_pipeline, crawl_metrics, page_no, targets, start_row, tabs)
+            return func_http(driver, crawl_pipeline, crawl_metrics, page_no, targets, start_row, tabs)
+        print(f"NO ROW LINKS ON PAGE {page_no}, CLICKING THROUGH INSTEAD")
+    return func(driver, crawl_pipeline, crawl_metrics, page_no, start_row)
+
+def next_page(driver):
+    rows = waits.wait_for(driver, waits.rows_ready(1), "itemSingleCol")
+    with rate_limiter.shared_limiter.request(driver.current_url):
+        element = hyperSel.selenium_utilities.get_element_by_class(driver, class_name="nextButton")
+        element.click()
+        if rows:
+            waits.wait_for(driver, waits.list_replaced(rows[0]), "next page")
+
+def resume_position(resume):
+    """Page number and row to start on, (1, 0) unless there is a checkpoint for this search."""
+    if not resume:
+        return 1, 0
+    saved = checkpoint.load_checkpoint("second_site", SEARCH_PARAMS)
+    if not saved:
+        return 1, 0
+    page_no, row = saved["offset"], saved["row"] + 1
+    if row >= ITEMS_PER_PAGE:
+        page_no, row = page_no + 1, 0
+    return page_no, row
         
 
-def main(progress_queue=None):
-    driver = hyperSel.selenium_utilities.open_site_selenium("https://secure.lni.wa.gov/verify/", show_browser=False)
-    hyperSel.selenium_utilities.maximize_the_window(driver)
+def open_search(lean=True):
+    """A browser on page 1 of the Name search with 100 rows a page, and the item count the site reports (0 if it never showed)."""
+    driver = driver_profile.open_driver(site_urls.WA_BASE_URL, show_browser=False, lean=lean)
 
     go_to_page_from_home(driver)
-    time.sleep(2)
+    rate_limiter.shared_limiter.wait(driver.current_url)
     attempts = 0
-    total = None
+    items = None
     
     while True:
         attempts += 1
         if attempts >= 15:
-            total = 0
+            items = 0
             break
         
         try:
-            total = int(get_total_items(driver)) + 100
+            items = int(get_total_items(driver))
             break
         except Exception as e:
             time.sleep(2)
@@ -233,45 +399,167 @@ def main(progress_queue=None):
     
     results_dropdown = Select(hyperSel.selenium_utilities.select_element_by_id(driver, "resultsLengthSelect"))
     results_dropdown.select_by_visible_text("100 items")
+    return driver, items
 
-    total_time = time.time()
+def close_quietly(driver):
+    try:
+        hyperSel.selenium_utilities.close_driver(driver)
+    except Exception as e:
+        pass
 
-    iter_ = 1
-    items_per_page = 100
-    page_no = 0
-    loops = 0
-    while iter_ < total:
+def crawl_pages_in_pool(driver, items, drivers, crawl_pipeline, crawl_metrics, progress_queue=None, detail_mode="click", tabs=DETAIL_TABS, lean=True):
+    """
+    drivers browsers, each claiming PAGES_PER_RANGE result pages at a time and clicking through them on
+    its own. They all submit into the one pipeline, so there is still a single writer. driver is the
+    browser main() already opened, it becomes the first worker. Returns the pages that never got done.
+    """
+    # Straight from the item count, the serial loop's extra +100 page would just be an empty page here
+    page_numbers = list(range(1, -(-items // ITEMS_PER_PAGE) + 1))
+    work = page_scheduler.RangeQueue(page_numbers, PAGES_PER_RANGE)
+    progress_lock = threading.Lock()
+    rows_done = [0]
+
+    def report_page(rows):
+        # Only finished pages count, and with what they really submitted. A page that crashed part way
+        # is counted once, when it is crawled again, so its rows re-submitted then dont count twice
+        with progress_lock:
+            rows_done[0] += rows
+            done = min(rows_done[0], items)
         if progress_queue:
-            progress_queue.put(iter_ / total)
+            progress_queue.put(crawl_metrics.progress(done, items))
 
-        time.sleep(1)
-        loops += 1
-        if loops >= 5000:
-            print("SOMETHING HAS GONE BADLY WRONG")
-            break
+    def worker(worker_id, driver):
+        current_page = 1 if driver else None
+        restarts = 0
+        while (page_range := work.claim()) is not None:
+            pending = list(page_range)
+            try:
+                if driver is None or pending[0] < current_page:
+                    # Fresh browser, or a put back range behind us, the list only goes forwards
+                    if driver:
+                        close_quietly(driver)
+                    driver, _ = open_search(lean)
+                    current_page = 1
+                while pending:
+                    page_no = pending[0]
+                    with crawl_metrics.stage("navigation", page=page_no, worker=worker_id):
+                        while current_page < page_no:
+                            next_page(driver)
+                            current_page += 1
+                    rows = crawl_page(driver, crawl_pipeline, crawl_metrics, page_no, detail_mode=detail_mode, tabs=tabs)
+                    pending.pop(0)
+                    report_page(rows)
+                work.finish()
+            except Exception as e:
+                # Only this worker's unfinished pages go back, rows it already submitted just get upserted again
+                print(f"WORKER {worker_id} FAILED ON PAGE {pending[0]}: {e}")
+                work.requeue(pending)
+                close_quietly(driver)
+                driver = None
+                restarts += 1
+                if restarts > WORKER_RESTARTS:
+                    print(f"WORKER {worker_id} GAVE UP AFTER {restarts} CRASHES")
+                    return
+        if driver:
+            close_quietly(driver)
+
+    threads = [threading.Thread(target=worker, args=(i, driver if i == 0 else None), daemon=True) for i in range(drivers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return work.remaining()
+
+def main(progress_queue=None, resume=False, parse_workers=2, record_queue=None, drivers=1, detail_mode="click", tabs=DETAIL_TABS, lean=True):
+    driver, items = open_search(lean)
+    total = items + 100  # The serial loop has always run to the reported count +100
 
-        page_no += 1
-        func(driver)
-        
-        iter_ += items_per_page
-        
-        time.sleep(5)
-        
-        # Move to next page
-        element = hyperSel.selenium_utilities.get_element_by_class(driver, class_name="nextButton")
-        element.click()
+    total_time = time.time()
 
+    items_per_page = ITEMS_PER_PAGE
+    pooled = drivers > 1
+    if pooled and resume:
+        # Pages finish out of order across browsers, a single page/row checkpoint cant describe that
+        print("--resume is ignored with more than one driver")
+        resume = False
+    start_page, start_row = resume_position(resume)
+    if start_page > 1 or start_row > 0:
+        print(f"Resuming at page {start_page}, row {start_row}")
+    # The results list has no page url, so get back to the page by clicking through
+    for _ in range(start_page - 1):
+        next_page(driver)
+
+    iter_ = 1 + (start_page - 1) * items_per_page
+    page_no = start_page - 1
+    loops = 0
+    record_store = store.RecordStore()
+    crawl_metrics = metrics.CrawlMetrics("second_site", tags={"profile": "lean" if lean else "full"})
+    crawl_pipeline = pipeline.CrawlPipeline(
+        parse=functools.partial(parse_detail, crawl_metrics=crawl_metrics),
+        write=functools.partial(write_detail, record_store, record_queue, crawl_metrics, save_checkpoint=not pooled),
+        parse_workers=parse_workers,
+    )
+    finished = False
     try:
-        hyperSel.selenium_utilities.close_driver(driver)
-    except Exception as e:
-        pass
+        if pooled:
+            unfinished = crawl_pages_in_pool(driver, items, drivers, crawl_pipeline, crawl_metrics, progress_queue, detail_mode, tabs, lean)
+            driver = None  # The workers close their own browsers
+            if unfinished:
+                print("PAGES NEVER CRAWLED:", unfinished)
+            finished = not unfinished
+        else:
+            while iter_ < total:
+                if progress_queue:
+                    # Fraction done plus the measured rate, the gui turns it into records/min and an eta
+                    progress_queue.put(crawl_metrics.progress(iter_, total))
+
+                loops += 1
+                if loops >= 5000:
+                    print("SOMETHING HAS GONE BADLY WRONG")
+                    break
+
+                page_no += 1
+                crawl_page(driver, crawl_pipeline, crawl_metrics, page_no, start_row, detail_mode=detail_mode, tabs=tabs)
+                start_row = 0
+                
+                iter_ += items_per_page
+                
+                # Move to next page
+                with crawl_metrics.stage("navigation", page=page_no):
+                    next_page(driver)
+            else:
+                finished = True
+    finally:
+        crawl_pipeline.close()
+        if crawl_pipeline.failed:
+            print("FAILED, --resume will start again before the first of these:", crawl_pipeline.failed)
+        elif finished and not crawl_pipeline.errors:
+            checkpoint.clear_checkpoint("second_site")
+        record_store.close()
+        crawl_metrics.close()
+
+    if driver:
+        close_quietly(driver)
 
     if progress_queue:
         progress_queue.put(1)  # Signal 100% completion
 
     print("TOTAL TIME TAKEN", time.time() - total_time)
+    waits.wait_stats.print_summary()
     
 if __name__ == "__main__":
+    import argparse
     from queue import Queue
+    parser = argparse.ArgumentParser(description="Crawl the Washington L&I contractor search")
+    parser.add_argument("--resume", action="store_true", help="continue from the last checkpointed page/row")
+    parser.add_argument("--parse-workers", type=int, default=2, help="threads parsing detail pages off the browser thread")
+    parser.add_argument("--drivers", type=int, default=1, help="headless browsers crawling result pages side by side")
+    parser.add_argument("--detail-mode", choices=DETAIL_MODES, default="click",
+                        help="click each row and go back, or read the row links once and open them in tabs / fetch them over http")
+    parser.add_argument("--tabs", type=int, default=DETAIL_TABS, help="detail tabs or http fetches open at once")
+    parser.add_argument("--lean", action=argparse.BooleanOptionalAction, default=True,
+                        help="images off, fonts/media blocked and a small viewport (--no-lean to compare page load times)")
+    args = parser.parse_args()
     progress_queue = Queue()
-    main(progress_queue)
\ No newline at end of file
+    main(progress_queue, resume=args.resume, parse_workers=args.parse_workers, drivers=args.drivers,
+         detail_mode=args.detail_mode, tabs=args.tabs, lean=args.lean)
\ No newline at end of file
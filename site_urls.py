@@ -0,0 +1,11 @@
+import os
+'''
+WHERE EACH CRAWLER POINTS, THE LIVE SITES UNLESS OVERRIDDEN FROM THE ENVIRONMENT
+Point both at replay_server.py to crawl without the network:
+    CRAWL_OR_BASE_URL=http://127.0.0.1:8765/exs/all/mylicsearch/ CRAWL_WA_BASE_URL=http://127.0.0.1:8765/verify/ python gui.py
+'''
+OR_BASE_URL = os.environ.get("CRAWL_OR_BASE_URL", "https://www4.cbs.state.or.us/exs/all/mylicsearch/")
+WA_BASE_URL = os.environ.get("CRAWL_WA_BASE_URL", "https://secure.lni.wa.gov/verify/")
+
+# The search the first crawler starts from, relative to OR_BASE_URL
+OR_SEARCH_PATH = "index.cfm?fuseaction=search.show_search_name&group_id=30"
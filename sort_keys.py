@@ -0,0 +1,116 @@
+from datetime import datetime
+import numpy as np
+from filter_masks import is_missing
+'''
+SORT ORDERS FOR THE GUI, EVERY FIELD IS PARSED ONCE INTO A TYPED KEY AND THE SORTED ORDER IS CACHED
+Dates sort as real dates (MM/DD/YYYY compared as a string puts 01/02/2030 before 12/31/2020).
+'''
+TEXT = "text"
+DATE = "date"
+
+SORT_FIELDS = {
+    "owner_name": TEXT,
+    "license_number": TEXT,
+    "business_type": TEXT,
+    "expiration_date": DATE,
+}
+
+# Text keys are compared on their first TEXT_KEY_BYTES utf-8 bytes, plenty to order names and license numbers
+TEXT_KEY_BYTES = 32
+DATE_FORMATS = ("%m/%d/%Y", "%Y-%m-%d", "%Y-%m-%d %H:%M:%S")
+
+def text_key(value):
+    if is_missing(value):
+        return None
+    return str(value).strip().encode("utf-8")[:TEXT_KEY_BYTES]
+
+def date_key(value):
+    if is_missing(value):
+        return None
+    value = str(value).strip()
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).toordinal()
+        except ValueError:
+            continue
+    return None
+
+KEY_PARSERS = {TEXT: text_key, DATE: date_key}
+KEY_DTYPES = {TEXT: f"S{TEXT_KEY_BYTES}", DATE: np.int64}
+
+class SortCache:
+    """
+    Per field: the parsed keys, plus (once someone sorts on it) the ids with a key in ascending
+    order and the ids without one. New records are merged into a built order with searchsorted
+    instead of sorting everything again. Missing values always go last, whichever direction.
+    """
+    def __init__(self, fields=SORT_FIELDS):
+        self.fields = fields
+        self.keys = {field: [] for field in fields}
+        self.orders = {}
+
+    def __len__(self):
+        return len(next(iter(self.keys.values()))) if self.keys else 0
+
+    def add_many(self, entries):
+        for field, kind in self.fields.items():
+            parse = KEY_PARSERS[kind]
+            self.keys[field].extend(parse(entry.get(field)) for entry in entries)
+
+    def replace(self, record_id, entry):
+        """A record that changed in place, it is moved within any order already built instead of re-sorting."""
+        for field, kind in self.fields.items():
+            key = KEY_PARSERS[kind](entry.get(field))
+            if key == self.keys[field][record_id]:
+                continue
+            self.keys[field][record_id] = key
+            order = self.orders.get(field)
+            if order is None or record_id >= order["size"]:
+                continue  # Not in a built order yet, it gets merged from keys like any new record
+            at = np.flatnonzero(order["ids"] == record_id)
+            if len(at):
+                order["ids"] = np.delete(order["ids"], at)
+                order["keys"] = np.delete(order["keys"], at)
+            else:
+                order["missing"] = order["missing"][order["missing"] != record_id]
+            if key is None:
+                # Missing keys are kept in id order
+                order["missing"] = np.insert(order["missing"], np.searchsorted(order["missing"], record_id), record_id)
+            else:
+                key = np.array([key], dtype=KEY_DTYPES[kind])
+                position = np.searchsorted(order["keys"], key, side="right")
+                order["ids"] = np.insert(order["ids"], position, record_id)
+                order["keys"] = np.insert(order["keys"], position, key)
+
+    def _sorted_slice(self, field, start, end):
+        keys = self.keys[field][start:end]
+        present = [start + offset for offset, key in enumerate(keys) if key is not None]
+        missing = [start + offset for offset, key in enumerate(keys) if key is None]
+        present_keys = np.array([self.keys[field][record_id] for record_id in present], dtype=KEY_DTYPES[self.fields[field]])
+        present = np.array(present, dtype=np.int64)
+        by_key = np.argsort(present_keys, kind="stable")
+        return present[by_key], present_keys[by_key], np.array(missing, dtype=np.int64)
+
+    def _update(self, field):
+        size = len(self.keys[field])
+        order = self.orders.get(field)
+        if order is None:
+            ids, keys, missing = self._sorted_slice(field, 0, size)
+            self.orders[field] = {"ids": ids, "keys": keys, "missing": missing, "size": size}
+            return
+        if order["size"] == size:
+            return
+        ids, keys, missing = self._sorted_slice(field, order["size"], size)
+        # side="right" keeps older records ahead of newer ones with the same key
+        positions = np.searchsorted(order["keys"], keys, side="right")
+        order["ids"] = np.insert(order["ids"], positions, ids)
+        order["keys"] = np.insert(order["keys"], positions, keys)
+        order["missing"] = np.concatenate((order["missing"], missing))
+        order["size"] = size
+
+    def order(self, field, ascending=True):
+        """Every record id in sorted order. Flipping the direction is just a reversed view of the cached order."""
+        self._update(field)
+        order = self.orders[field]
+        ids = order["ids"] if ascending else order["ids"][::-1]
+        return np.concatenate((ids, order["missing"]))
@@ -0,0 +1,272 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+'''
+ONE SQLITE FILE HOLDING EVERY CRAWLED RECORD FROM BOTH SITES, THE CRAWLERS UPSERT INTO IT AND THE GUI READS FROM IT
+data.csv is just an export of this now, written only when asked for:
+    python store.py export [csv_path]        (writes ./logs/data.csv by default, baseline included, sorted by expiration_date)
+    python store.py parquet [path]           (typed columns, see parquet_export.py)
+    python store.py import [json_path]       (pulls an old ./logs/crawl_data.json in)
+An old ./logs/crawl_data.json is also pulled in on its own the first time the gui loads or an export runs,
+then renamed to crawl_data.json.imported so it only ever happens once.
+'''
+STORE_PATH = './logs/records.sqlite3'
+LEGACY_JSON_PATH = './logs/crawl_data.json'
+
+# Values the crawlers use for "nothing here", never treat these as keys
+EMPTY_VALUES = (None, "", "N/A", "n/a", "null")
+
+# Pulled out of the record into real columns so the store can be queried without parsing json,
+# the full record (whatever fields that site has) stays in the data column. The gui keeps its own
+# in memory search/filter/sort indexes (search_index, filter_masks, sort_keys), so only the upsert keys get an index
+INDEXED_FIELDS = ("owner_name", "license_number", "business_type", "expiration_date", "city", "address1", "phone_number")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY,
+    site TEXT NOT NULL,
+    current_url TEXT,
+    owner_name TEXT,
+    license_number TEXT,
+    business_type TEXT,
+    expiration_date TEXT,
+    expiration_sort TEXT,  -- ISO copy of expiration_date so it sorts as a date in plain SQL
+    city TEXT,
+    address1 TEXT,
+    phone_number TEXT,
+    data TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS records_current_url ON records (current_url);
+CREATE INDEX IF NOT EXISTS records_site_license ON records (site, license_number);
+"""
+
+INSERTED = "inserted"
+UPDATED = "updated"
+UNCHANGED = "unchanged"
+
+def clean_value(value):
+    if value in EMPTY_VALUES:
+        return None
+    return str(value).strip()
+
+def iso_date(value):
+    # MM/DD/YYYY from both sites -> YYYY-MM-DD, anything else is left out of the sort column
+    value = clean_value(value)
+    if value is None:
+        return None
+    try:
+        return datetime.strptime(value, "%m/%d/%Y").strftime("%Y-%m-%d")
+    except ValueError:
+        return None
+
+def iter_json_records(filepath, chunk_size=1 << 16):
+    """
+    Streams records out of a JSON list file (or one object per line) without json.load-ing
+    the whole thing, so memory stays flat no matter how big the old crawl_data.json got.
+    """
+    decoder = json.JSONDecoder()
+    with open(filepath, "r") as file:
+        buffer = file.read(chunk_size)
+        pos = 0
+        eof = not buffer
+
+        def skip(pos, chars):
+            while pos < len(buffer) and (buffer[pos].isspace() or buffer[pos] in chars):
+                pos += 1
+            return pos
+
+        pos = skip(pos, "[")
+        while True:
+            pos = skip(pos, ",")
+            if pos >= len(buffer) and not eof:
+                buffer, pos = file.read(chunk_size), 0
+                eof = not buffer
+                continue
+            if pos >= len(buffer) or buffer[pos] == "]":
+                return
+            try:
+                record, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    print("Warning: JSON decoding failed part way through the file, keeping what was read.")
+                    return
+                # Record runs past the end of the buffer, read more and try again
+                more = file.read(chunk_size)
+                eof = not more
+                buffer, pos = buffer[pos:] + more, 0
+                continue
+            yield record
+            pos = end
+
+class RecordStore:
+    """
+    Upserts on current_url, falling back to the license number for the same site. Safe to share
+    between threads, the pipeline writer thread writes while other threads read through their own store.
+    """
+    def __init__(self, db_path=STORE_PATH):
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+        self.counts = {INSERTED: 0, UPDATED: 0, UNCHANGED: 0}
+        self.skipped_by_reason = {}
+
+    def _find(self, site, current_url, license_number):
+        if current_url is not None:
+            row = self.conn.execute("SELECT id, data FROM records WHERE current_url = ?", (current_url,)).fetchone()
+            if row:
+                return row
+        if license_number is not None:
+            return self.conn.execute(
+                "SELECT id, data FROM records WHERE site = ? AND license_number = ?", (site, license_number)
+            ).fetchone()
+        return None
+
+    def _upsert(self, site, record, now):
+        current_url = clean_value(record.get("current_url"))
+        license_number = clean_value(record.get("license_number"))
+        data = json.dumps(record, sort_keys=True, default=str)
+        columns = {field: clean_value(record.get(field)) for field in INDEXED_FIELDS}
+        columns["expiration_sort"] = iso_date(record.get("expiration_date"))
+
+        existing = self._find(site, current_url, license_number)
+        if existing is None:
+            names = ["site", "current_url", *columns, "data", "first_seen", "last_seen"]
+            values = [site, current_url, *columns.values(), data, now, now]
+            self.conn.execute(
+                f"INSERT INTO records ({', '.join(names)}) VALUES ({', '.join('?' for _ in names)})", values
+            )
+            return INSERTED
+
+        record_id, old_data = existing
+        if old_data == data:
+            self.conn.execute("UPDATE records SET last_seen = ? WHERE id = ?", (now, record_id))
+            return UNCHANGED
+        # current_url too, a match on the license number can come with a new url. No other row can hold
+        # that url (_find looks it up first), so the unique index is safe. A record with no url keeps the old one
+        assignments = ", ".join(f"{name} = ?" for name in columns)
+        self.conn.execute(
+            f"UPDATE records SET current_url = COALESCE(?, current_url), {assignments}, data = ?, last_seen = ? WHERE id = ?",
+            [current_url, *columns.values(), data, now, record_id],
+        )
+        return UPDATED
+
+    def upsert(self, site, record):
+        """Returns INSERTED, UPDATED (something in the record changed) or UNCHANGED."""
+        return self.upsert_many(site, [record])[0]
+
+    def upsert_many(self, site, records):
+        # One transaction per batch, a page of records is one commit instead of one each
+        with self.lock:
+            now = time.time()
+            statuses = [self._upsert(site, record, now) for record in records]
+            self.conn.commit()
+            for status in statuses:
+                self.counts[status] += 1
+        return statuses
+
+    def count_skipped(self, reason):
+        # For records dropped before they got here (eg the hardcoded address list) so they show in the totals
+        with self.lock:
+            self.skipped_by_reason[reason] = self.skipped_by_reason.get(reason, 0) + 1
+
+    def stats(self):
+        return {**self.counts, "skipped": dict(self.skipped_by_reason)}
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def iter_records(self, batch_size=500, after_id=0):
+        """Yields lists of records in insert order. Keyset on id, so each batch is an index seek however far in."""
+        while True:
+            with self.lock:
+                rows = self.conn.execute(
+                    "SELECT id, data FROM records WHERE id > ? ORDER BY id LIMIT ?", (after_id, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            after_id = rows[-1][0]
+            yield [json.loads(data) for _, data in rows]
+
+    def export_csv(self, csv_path='./logs/data.csv', include_baseline=True):
+        """
+        The one way data.csv gets written. Crawled records then the hardcoded baseline like the old gui export,
+        the compaction on close drops repeated current_urls (the crawled copy wins) and sorts by expiration_date.
+        """
+        import csv_converter
+        # Fresh file swapped in at the end, the old export stays readable until then
+        tmp_path = csv_path + '.export'
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        with csv_converter.CsvSink(tmp_path, batch_size=1000) as csv_sink:
+            for batch in self.iter_records(batch_size=1000):
+                csv_sink.write(batch)
+            if include_baseline:
+                import baseline_data
+                csv_sink.write(baseline_data.data_json_hardcoded)
+        os.replace(tmp_path, csv_path)
+        print(f"Exported {len(self)} crawled records{' and the baseline' if include_baseline else ''} to {csv_path}")
+
+    def import_json(self, json_path=LEGACY_JSON_PATH, site="legacy"):
+        """Pulls records from the old log_data json file in, used once when moving an install over."""
+        imported = 0
+        batch = []
+        for record in iter_json_records(json_path):
+            if isinstance(record, dict):
+                batch.append(record)
+            if len(batch) >= 500:
+                imported += self.upsert_many(site, batch).count(INSERTED)
+                batch = []
+        if batch:
+            imported += self.upsert_many(site, batch).count(INSERTED)
+        print(f"Imported {imported} new records from {json_path}")
+        return imported
+
+    def migrate_legacy_json(self, json_path=LEGACY_JSON_PATH):
+        """
+        One shot move of the old crawl_data.json into the store, keyed on the file and not on the store
+        being empty, a crawler can easily have written to the store first. Renamed once imported, if the
+        import dies part way the file stays and the next call just upserts it again.
+        """
+        if not os.path.exists(json_path) or os.path.getsize(json_path) == 0:
+            return 0
+        imported = self.import_json(json_path)
+        os.replace(json_path, json_path + '.imported')
+        return imported
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+        print("STORE STATS:", self.stats())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "export"
+    with RecordStore() as record_store:
+        if command in ("export", "parquet"):
+            record_store.migrate_legacy_json()
+        if command == "export":
+            record_store.export_csv(*sys.argv[2:3])
+        elif command == "parquet":
+            import parquet_export
+            parquet_export.export_store(record_store, *sys.argv[2:3])
+        elif command == "import":
+            record_store.import_json(*sys.argv[2:3])
+        else:
+            print("usage: python store.py [export|parquet|import] [path]")
@@ -0,0 +1,85 @@
+import threading
+import time
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+'''
+EXPLICIT WAITS, RETURN AS SOON AS THE PAGE IS READY INSTEAD OF SLEEPING A FIXED AMOUNT
+'''
+DEFAULT_TIMEOUT = 15
+POLL_FREQUENCY = 0.1
+
+class WaitStats:
+    """Keeps how long each named wait took so we can see where per record time goes."""
+    def __init__(self):
+        self.timings = {}
+        self.timeouts = {}
+        self.lock = threading.Lock()  # Pooled second_site browsers all wait at once
+
+    def add(self, name, seconds, timed_out=False):
+        with self.lock:
+            self.timings.setdefault(name, []).append(seconds)
+            if timed_out:
+                self.timeouts[name] = self.timeouts.get(name, 0) + 1
+
+    def summary(self):
+        report = {}
+        for name, values in self.timings.items():
+            ordered = sorted(values)
+            report[name] = {
+                "count": len(values),
+                "avg": round(sum(values) / len(values), 3),
+                "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+                "max": round(ordered[-1], 3),
+                "timeouts": self.timeouts.get(name, 0),
+            }
+        return report
+
+    def print_summary(self):
+        for name, stats in self.summary().items():
+            print(f"WAIT {name}: {stats}")
+
+wait_stats = WaitStats()
+
+def wait_for(driver, predicate, name, timeout=DEFAULT_TIMEOUT, stats=wait_stats):
+    """
+    Polls predicate(driver) until it returns something truthy and returns that value.
+    Returns None on timeout so callers can decide what to do, the latency is recorded either way.
+    """
+    start = time.monotonic()
+    try:
+        result = WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY).until(predicate)
+        stats.add(name, time.monotonic() - start)
+        return result
+    except TimeoutException:
+        stats.add(name, time.monotonic() - start, timed_out=True)
+        print(f"Timed out waiting for {name} after {timeout}s")
+        return None
+
+# Predicates, same shape as selenium expected_conditions so they plug into WebDriverWait
+
+def rows_ready(min_count):
+    """The results list has rendered at least min_count itemSingleCol rows, returns the rows."""
+    def predicate(driver):
+        rows = driver.find_elements(By.CLASS_NAME, "itemSingleCol")
+        return rows if len(rows) >= min_count else False
+    return predicate
+
+def row_count(driver):
+    """How many itemSingleCol rows are on the list right now, no waiting."""
+    return len(driver.find_elements(By.CLASS_NAME, "itemSingleCol"))
+
+def detail_ready(driver):
+    """A license detail view is up, both the WholeLicense block and the itemLayout div exist."""
+    if driver.find_elements(By.ID, "WholeLicense") and driver.find_elements(By.CLASS_NAME, "itemLayout"):
+        return True
+    return False
+
+def detail_gone(driver):
+    """Back on the list, the detail view has been torn down."""
+    return not driver.find_elements(By.ID, "WholeLicense")
+
+def list_replaced(old_row):
+    """The results list re-rendered (eg after nextButton), the row we held on to is gone from the DOM."""
+    return EC.staleness_of(old_row)